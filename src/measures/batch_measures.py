@@ -0,0 +1,186 @@
+"""This module calculates measures for many edgelists in a pool of processes and
+    writes them to a csv file with a header, one row per graph."""
+
+import argparse
+import csv
+import glob
+import graph_measures
+import igraph
+import json
+import measure_context
+import multiprocessing
+import os
+import profiling
+import sys
+
+def list_files(inputs):
+  """Returns the sorted edgelist files given by directories or glob patterns."""
+  filenames = set()
+  for pattern in inputs:
+    if os.path.isdir(pattern):
+      pattern = os.path.join(pattern, '*')
+    filenames.update(filename for filename in glob.glob(pattern)
+        if os.path.isfile(filename))
+  return sorted(filenames)
+
+def done_files(out_filename):
+  """Returns the set of files that already have a row in the output."""
+  if not os.path.exists(out_filename):
+    return set()
+  with open(out_filename, 'r') as out_file:
+    return set(row[0] for row in csv.reader(out_file) if row)
+
+def measure_file(task):
+  """Calculates the measures of one edgelist.
+
+  Parameters:
+    task: A tuple (filename, measures, options), where measures is a list of
+        measure method names and options configures the
+        measure_context.MeasureContext.
+
+  Returns:
+    A tuple (filename, row, profile), where row is None if the graph failed
+        and profile is the list of records of each measure when the option
+        profile is set.
+  """
+  filename, measures, options = task
+  try:
+    graph = igraph.Graph.Read_Edgelist(filename, directed=False)
+    context = measure_context.MeasureContext(graph, **options)
+    row = graph_measures.Measures.calculate_measures(graph, measures, context)
+    return filename, row, context.profile
+  except Exception as exception:
+    print >> sys.stderr, 'Error in', filename + ':', exception
+    return filename, None, []
+
+def read_profile(profile_filename):
+  """Returns the list of records of every measure in a profile file."""
+  records = []
+  with open(profile_filename, 'r') as profile_file:
+    for line in profile_file:
+      if line.strip():
+        records.extend(json.loads(line)['measures'])
+  return records
+
+def check_workers(workers, options):
+  """Raises a ValueError if the measures of each graph would start their own
+  processes inside the pool of graphs, whose daemonic processes cannot have
+  children.
+
+  Parameters:
+    workers: An integer indicating the number of processes of the pool of
+        graphs(None is the number of cpus).
+    options: A dict with options of the measure_context.MeasureContext.
+  """
+  if workers != 1 and options.get('workers', 1) > 1:
+    raise ValueError('The option workers=%s needs a single process per graph '
+        '(-w 1).' % options['workers'])
+
+def run(inputs, out_filename, measures=None, workers=None, options=None,
+    profile_filename=None):
+  """Calculates the measures of the edgelists and appends them to the output.
+  The graphs that already have a row in the output are skipped, so an
+  interrupted run can be resumed.
+
+  Parameters:
+    inputs: A list of directories or glob patterns of edgelists.
+    out_filename: A string indicating the csv file.
+    measures: A list of measure method names(default=all).
+    workers: An integer indicating the number of processes(default=number of
+        cpus).
+    options: A dict with options of the measure_context.MeasureContext.
+    profile_filename: A string indicating a file where the wall time, cpu time
+        and memory of each measure are appended, one json line per
+        graph(optional).
+
+  Returns:
+    An integer indicating the number of graphs measured. The graphs that failed
+        are reported in the standard error and retried by the next run.
+  """
+  measures = graph_measures.Measures.column_names(measures)
+  done = done_files(out_filename)
+  options = dict(options or {})
+  check_workers(workers, options)
+  if profile_filename:
+    options['profile'] = True
+  tasks = [(filename, measures, options)
+      for filename in list_files(inputs) if filename not in done]
+  count = 0
+  failed = 0
+  write_header = not os.path.exists(out_filename) or not os.path.getsize(
+      out_filename)
+  profile_file = open(profile_filename, 'a') if profile_filename else None
+  with open(out_filename, 'a') as out_file:
+    writer = csv.writer(out_file)
+    if write_header:
+      writer.writerow(['filename'] + measures)
+    pool = multiprocessing.Pool(workers) if workers != 1 else None
+    try:
+      results = (pool.imap_unordered(measure_file, tasks) if pool
+          else (measure_file(task) for task in tasks))
+      for filename, row, profile in results:
+        if row is None:
+          failed += 1
+          continue
+        writer.writerow([filename] + row)
+        out_file.flush()
+        if profile_file:
+          profile_file.write(json.dumps({'filename': filename,
+              'measures': profile}) + '\n')
+          profile_file.flush()
+        count += 1
+    finally:
+      if pool:
+        pool.close()
+        pool.join()
+      if profile_file:
+        profile_file.close()
+  if failed:
+    print >> sys.stderr, '%d of %d graphs failed.' % (failed, len(tasks))
+  return count
+
+def parse_options(option_list):
+  """Converts a list of "name=value" strings to a dict of context options."""
+  options = {}
+  for option in option_list or []:
+    name, value = option.split('=', 1)
+    for convert in (int, float):
+      try:
+        value = convert(value)
+        break
+      except ValueError:
+        pass
+    options[name] = value
+  return options
+
+def main():
+  parser = argparse.ArgumentParser()
+  parser.add_argument('-i', '--inputs', nargs='+',
+      help='Directories or glob patterns of the edgelists.', required=True)
+  parser.add_argument('-o', '--out_filename',
+      help='Csv file where the measures will be written to.', required=True)
+  parser.add_argument('-m', '--measures', nargs='+',
+      help='Measures to be calculated, such as measure_diameter (default=all).')
+  parser.add_argument('-w', '--workers', type=int,
+      help='Number of processes (default=number of cpus).')
+  parser.add_argument('-p', '--options', nargs='+',
+      help='Options of the measures as name=value, such as '
+          'betweenness_error=0.05.')
+  parser.add_argument('--profile',
+      help='Json lines file where the time and memory of each measure are '
+          'appended. A summary by measure is printed at the end.')
+
+  args = vars(parser.parse_args())
+  measures = args['measures']
+  if measures:
+    measures = [measure if measure.startswith('measure_')
+        else 'measure_' + measure for measure in measures]
+
+  run(args['inputs'], args['out_filename'], measures, args['workers'],
+      parse_options(args['options']), args['profile'])
+  if args['profile']:
+    summary = profiling.summarize(read_profile(args['profile']))
+    print json.dumps(summary, indent=2, sort_keys=True)
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,120 @@
+"""This module approximates the betweenness of the vertices of a graph with
+    Brandes accumulation from a sample of pivot sources."""
+
+import csr
+import math
+import numpy
+import source_pool
+import time
+
+def prepare(graph):
+  """Returns a tuple (adjacency, incoming) with the CSR adjacency matrix, whose
+  rows hold the successors of each vertex, and the CSR matrix whose rows hold
+  its predecessors, which is the same matrix for undirected graphs."""
+  adjacency = csr.adjacency_matrix(graph)
+  if not graph.is_directed():
+    return adjacency, adjacency
+  return adjacency, adjacency.T.tocsr()
+
+def dependency_sums(state, sources):
+  """Accumulates the dependencies of the vertices on each source.
+  The shortest path counts are propagated from the predecessors and the
+  dependencies from the successors, one breadth first search layer at a time
+  with sparse matrix products.
+
+  Parameters:
+    state: A tuple (adjacency, incoming) built by prepare.
+    sources: A list of vertices.
+
+  Returns:
+    A tuple (dependencies, totals), where dependencies is a numpy array with
+        the sum of the dependencies of each vertex over the sources and totals
+        is a numpy array with the sum of the dependencies of each source.
+  """
+  adjacency, incoming = state
+  size = adjacency.shape[0]
+  dependencies = numpy.zeros(size)
+  totals = numpy.zeros(len(sources))
+  sigma = numpy.zeros(size)
+  delta = numpy.zeros(size)
+  previous_sigma = numpy.zeros(size)
+  coefficients = numpy.zeros(size)
+  for index, source in enumerate(sources):
+    order, distances = csr.bfs_distances(adjacency, source)
+    layers = numpy.split(order,
+        numpy.flatnonzero(numpy.diff(distances[order])) + 1)
+    # Number of shortest paths from the source to each vertex.
+    sigma[order] = 0
+    sigma[source] = 1.0
+    previous_sigma[source] = 1.0
+    for previous, layer in zip(layers, layers[1:]):
+      sigma[layer] = incoming[layer].dot(previous_sigma)
+      previous_sigma[previous] = 0
+      previous_sigma[layer] = sigma[layer]
+    previous_sigma[layers[-1]] = 0
+    # Dependency of the source on each vertex, from the farthest layer.
+    delta[order] = 0
+    for layer, following in reversed(zip(layers[1:], layers[2:])):
+      coefficients[following] = (1.0 + delta[following]) / sigma[following]
+      delta[layer] = sigma[layer] * adjacency[layer].dot(coefficients)
+      coefficients[following] = 0
+    delta[source] = 0
+    dependencies[order] += delta[order]
+    totals[index] = delta[order].sum()
+  return dependencies, totals
+
+def approximate_betweenness(graph, workers=1, samples=None, error=None,
+    time_budget=None, batch_size=None, random_state=numpy.random):
+  """Estimates the betweenness of the vertices from pivot sources sampled
+  uniformly without replacement. Pivots are added in batches until samples
+  pivots are used, the relative standard error of the average betweenness is
+  at most error or the time budget is over.
+
+  Parameters:
+    graph: An igraph graph.
+    workers: An integer indicating the number of processes(default=1).
+    samples: An integer indicating the maximum number of pivots(default=all
+        the vertices, which gives the exact betweenness).
+    error: A double indicating the target relative standard error of the
+        average betweenness(optional).
+    time_budget: A double indicating the maximum number of seconds(optional).
+        At least one batch is always processed.
+    batch_size: An integer indicating the number of pivots added at a time
+        (default=max(16, 4 * workers)).
+    random_state: A numpy.random.RandomState used to sample the pivots.
+
+  Returns:
+    A tuple (betweenness, pivots, relative_error), where betweenness is a
+        numpy array with the estimated betweenness of each vertex, pivots is the
+        number of pivots used and relative_error is the relative standard
+        error of the average betweenness (0 when all the vertices are used).
+  """
+  start = time.time()
+  size = graph.vcount()
+  samples = size if samples is None else min(int(samples), size)
+  batch_size = batch_size or max(16, 4 * workers)
+  chunk_size = max(1, int(math.ceil(batch_size * 1.0 / workers)))
+  pivots = random_state.permutation(size)[:samples].tolist()
+  dependencies = numpy.zeros(size)
+  totals = []
+  relative_error = 0.0
+  with source_pool.SourcePool(graph, workers, prepare) as pool:
+    for begin in xrange(0, samples, batch_size):
+      for chunk_dependencies, chunk_totals in pool.map(dependency_sums,
+          pivots[begin:begin + batch_size], chunk_size):
+        dependencies += chunk_dependencies
+        totals.extend(chunk_totals)
+      used = len(totals)
+      if used == size:
+        relative_error = 0.0
+        break
+      mean = numpy.mean(totals)
+      relative_error = (numpy.std(totals, ddof=1) / math.sqrt(used) *
+          math.sqrt((size - used) * 1.0 / (size - 1)) / mean
+          if used > 1 and mean > 0 else numpy.inf)
+      if ((error is not None and relative_error <= error) or
+          (time_budget is not None and time.time() - start >= time_budget)):
+        break
+  # Each pair of an undirected graph is counted from both of its ends.
+  scale = size * 1.0 / len(totals) / (1 if graph.is_directed() else 2)
+  return dependencies * scale, len(totals), relative_error
@@ -0,0 +1,110 @@
+"""This module builds sparse (CSR) adjacency matrices of igraph graphs, so that
+    measures can be calculated with vectorized operations."""
+
+import numpy
+import scipy.sparse as sparse
+import scipy.sparse.csgraph as csgraph
+
+def adjacency_matrix(graph):
+  """Builds the adjacency matrix of a graph from its edge list.
+  Undirected edges are stored in both directions and multiple edges are
+  summed.
+
+  Parameters:
+    graph: An igraph graph.
+
+  Returns:
+    A scipy.sparse.csr_matrix of size n x n.
+  """
+  size = graph.vcount()
+  edges = numpy.array(graph.get_edgelist(), dtype=numpy.int64).reshape(-1, 2)
+  rows, columns = edges[:, 0], edges[:, 1]
+  if not graph.is_directed():
+    rows, columns = (numpy.concatenate([rows, columns]),
+        numpy.concatenate([columns, rows]))
+  return sparse.csr_matrix((numpy.ones(len(rows)), (rows, columns)),
+      shape=(size, size))
+
+def symmetric_adjacency_matrix(graph):
+  """Builds the adjacency matrix of a graph ignoring the direction of its
+  edges, so that searches follow igraph's mode ALL. It is the adjacency matrix
+  for undirected graphs.
+
+  Parameters:
+    graph: An igraph graph.
+
+  Returns:
+    A symmetric scipy.sparse.csr_matrix of size n x n.
+  """
+  adjacency = adjacency_matrix(graph)
+  if graph.is_directed():
+    adjacency = (adjacency + adjacency.T).tocsr()
+  return adjacency
+
+def bfs_distances(adjacency, source):
+  """Calculates the distances from the source with a breadth first search.
+  The depth of each vertex in the search tree is found by pointer jumping over
+  the predecessors, in O(n log d) vectorized operations.
+
+  Parameters:
+    adjacency: A scipy.sparse.csr_matrix built by adjacency_matrix.
+    source: An integer indicating the source vertex.
+
+  Returns:
+    A tuple (order, distances), where order is a numpy array with the reached
+        vertices in order of distance and distances is a numpy array with the
+        distance to each vertex, or -1 for unreached vertices.
+  """
+  order, predecessors = csgraph.breadth_first_order(adjacency, source,
+      directed=True, return_predecessors=True)
+  size = adjacency.shape[0]
+  parents = numpy.where(predecessors < 0, numpy.arange(size), predecessors)
+  distances = (predecessors >= 0).astype(numpy.int64)
+  while True:
+    grandparents = parents[parents]
+    if (grandparents == parents).all():
+      break
+    distances += distances[parents]
+    parents = grandparents
+  reached = numpy.zeros(size, dtype=bool)
+  reached[order] = True
+  distances[~reached] = -1
+  return order, distances
+
+def degrees(adjacency):
+  """Returns a numpy array with the degree of each vertex, the sum of its row.
+  For undirected graphs self-loops count twice, as in igraph."""
+  return numpy.asarray(adjacency.sum(axis=1)).ravel().astype(numpy.int64)
+
+def average_neighbor_degrees(adjacency, vertex_degrees):
+  """Returns a numpy array with the average degree of the neighbors of each
+  vertex, which is nan for isolated vertices."""
+  with numpy.errstate(divide='ignore', invalid='ignore'):
+    return adjacency.dot(vertex_degrees) / vertex_degrees
+
+def degree_assortativity(adjacency, vertex_degrees):
+  """Calculates the degree assortativity of an undirected graph, the Pearson
+  correlation of the degrees at the ends of the edges, from the entries of the
+  adjacency matrix. The sums are exact integers, so that regular graphs, whose
+  variance is 0, give nan as in igraph.
+
+  Parameters:
+    adjacency: A scipy.sparse.csr_matrix built by adjacency_matrix.
+    vertex_degrees: A numpy array with the degree of each vertex.
+
+  Returns:
+    A double that is the assortativity.
+  """
+  counts = adjacency.astype(numpy.int64)
+  # Python integers, since the products overflow 64 bits on large hubs.
+  weights = numpy.asarray(counts.sum(axis=1)).ravel().astype(object)
+  neighbor_sums = counts.dot(vertex_degrees.astype(numpy.int64)).astype(object)
+  degrees = vertex_degrees.astype(numpy.int64).astype(object)
+  total = weights.sum()
+  first = (weights * degrees).sum()
+  # Both are total ** 2 times the covariance and the variance.
+  covariance = total * (degrees * neighbor_sums).sum() - first ** 2
+  variance = total * (weights * degrees * degrees).sum() - first ** 2
+  if variance == 0:
+    return float('nan')
+  return float(covariance) / float(variance)
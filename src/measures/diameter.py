@@ -0,0 +1,146 @@
+"""This module calculates the exact diameter of a sparse graph with a few
+    breadth first searches, certified by the 4-sweep lower bound and the iFUB
+    (iterative fringe upper bound) algorithm."""
+
+import csr
+import numpy
+import scipy.sparse.csgraph as csgraph
+
+# Number of fringe vertices searched at once, one bit of a mask per vertex.
+BATCH_SIZE = 64
+
+class BudgetExceeded(Exception):
+  """Raised when the diameter needs more searches than allowed."""
+  pass
+
+class DiameterSearch(object):
+  """Breadth first searches over one undirected adjacency matrix, counting the
+  number of searches. After each search from x, the eccentricity of every
+  vertex v is bounded by d(x, v) + ecc(x), so that vertices that cannot improve
+  the lower bound are skipped. A search from a batch of fringe vertices at once
+  counts as one search."""
+
+  def __init__(self, adjacency, max_bfs=None):
+    self.adjacency = adjacency
+    self.max_bfs = max_bfs
+    self.bfs_runs = 0
+    self.upper_bounds = numpy.full(adjacency.shape[0],
+        numpy.iinfo(numpy.int64).max, dtype=numpy.int64)
+
+  def count_search(self):
+    """Counts a search, raising BudgetExceeded if max_bfs is reached."""
+    if self.max_bfs is not None and self.bfs_runs >= self.max_bfs:
+      raise BudgetExceeded()
+    self.bfs_runs += 1
+
+  def distances(self, source):
+    """Returns a tuple (farthest, distances) from the source."""
+    self.count_search()
+    order, distances = csr.bfs_distances(self.adjacency, source)
+    farthest = order[-1]
+    self.upper_bounds[order] = numpy.minimum(self.upper_bounds[order],
+        distances[order] + distances[farthest])
+    return farthest, distances
+
+  def component_diameter(self, vertices, degrees, lower_bound):
+    """Returns the diameter of the component with the given vertices, or
+    lower_bound if it is larger."""
+    # 4-sweep: a double sweep from the vertex with largest degree, another one
+    # from the center of the path found, and the center of the second path.
+    # They give a lower bound and the root with smallest eccentricity found.
+    start = vertices[numpy.argmax(degrees[vertices])]
+    roots = []
+    for _ in xrange(2):
+      a, from_start = self.distances(start)
+      roots.append((from_start[a], start, from_start))
+      b, from_a = self.distances(a)
+      _, from_b = self.distances(b)
+      lower_bound = max(lower_bound, from_a[b])
+      start = self.center(vertices, from_a, from_b)
+    farthest, from_start = self.distances(start)
+    roots.append((from_start[farthest], start, from_start))
+    level, root, from_root = min(roots, key=lambda item: item[0])
+    lower_bound = max(lower_bound, level)
+    fringes = vertices[numpy.argsort(-from_root[vertices], kind='mergesort')]
+    position = 0
+    # Every vertex closer to the root than level has eccentricity at most
+    # 2 * level, so the diameter is certified once the lower bound reaches it.
+    while 2 * level > lower_bound:
+      end = position
+      while end < len(fringes) and from_root[fringes[end]] == level:
+        end += 1
+      fringe = fringes[position:end]
+      fringe = fringe[self.upper_bounds[fringe] > lower_bound]
+      for begin in xrange(0, len(fringe), BATCH_SIZE):
+        if lower_bound >= 2 * level:
+          break
+        batch = fringe[begin:begin + BATCH_SIZE]
+        for vertex in self.beyond(batch, vertices, lower_bound):
+          if lower_bound >= 2 * level:
+            break
+          if self.upper_bounds[vertex] > lower_bound:
+            farthest, distances = self.distances(vertex)
+            lower_bound = max(lower_bound, distances[farthest])
+      position = end
+      if lower_bound > 2 * (level - 1):
+        break
+      level -= 1
+    return lower_bound
+
+  def beyond(self, sources, vertices, depth):
+    """Returns the sources whose eccentricity is larger than depth, with one
+    search from all the sources at once. Each vertex keeps a bit mask with the
+    sources that reached it, which is expanded depth times over the edges."""
+    self.count_search()
+    full = numpy.uint64(2 ** len(sources) - 1)
+    masks = numpy.zeros(self.adjacency.shape[0], dtype=numpy.uint64)
+    masks[sources] = numpy.left_shift(numpy.uint64(1),
+        numpy.arange(len(sources), dtype=numpy.uint64))
+    indptr, indices = self.adjacency.indptr, self.adjacency.indices
+    rows = numpy.flatnonzero(numpy.diff(indptr))
+    for _ in xrange(depth):
+      if (masks[vertices] == full).all():
+        return []
+      masks[rows] |= numpy.bitwise_or.reduceat(masks[indices], indptr[rows])
+    missing = numpy.bitwise_or.reduce(~masks[vertices] & full)
+    return [source for bit, source in enumerate(sources)
+        if int(missing) >> bit & 1]
+
+  def center(self, vertices, from_a, from_b):
+    """Returns the vertex in the middle of the path between a and b, which
+    minimizes the largest distance to both."""
+    return vertices[numpy.argmin(numpy.maximum(from_a[vertices],
+        from_b[vertices]))]
+
+def diameter(adjacency, max_bfs=None):
+  """Calculates the diameter of an undirected graph, the largest distance
+  between two vertices of the same component, as igraph's diameter does for
+  disconnected graphs.
+
+  Parameters:
+    adjacency: A symmetric scipy.sparse.csr_matrix built by
+        csr.adjacency_matrix.
+    max_bfs: An integer indicating the maximum number of breadth first
+        searches(optional).
+
+  Returns:
+    A tuple (diameter, bfs_runs), where diameter is None when max_bfs searches
+        were not enough.
+  """
+  search = DiameterSearch(adjacency, max_bfs)
+  count, labels = csgraph.connected_components(adjacency, directed=False)
+  sizes = numpy.bincount(labels, minlength=count)
+  order = numpy.argsort(labels, kind='mergesort')
+  starts = numpy.concatenate([[0], numpy.cumsum(sizes)])
+  degrees = csr.degrees(adjacency)
+  best = 0
+  try:
+    for component in numpy.argsort(-sizes, kind='mergesort'):
+      # The diameter of a component is smaller than its number of vertices.
+      if sizes[component] - 1 <= best:
+        break
+      vertices = order[starts[component]:starts[component + 1]]
+      best = search.component_diameter(vertices, degrees, best)
+  except BudgetExceeded:
+    return None, search.bfs_runs
+  return int(best), search.bfs_runs
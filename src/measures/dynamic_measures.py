@@ -0,0 +1,212 @@
+"""This module keeps the measures of a graph up to date while batches of edges
+    are added and removed, as in rewiring experiments."""
+
+import graph_measures
+import measure_context
+import numpy
+import scipy.stats as stats
+
+class DynamicMeasures(object):
+  """Measures of a simple undirected graph that changes over time.
+  The degree distribution, its Shannon entropy and second moment, the average
+  neighbor degree, the degree assortativity and the transitivity are updated
+  in O(degree) per changed edge from exact integer sums:
+    S1, S2, S3: sums of k, k^2 and k^3 over the vertices.
+    products: sum of k(u) * k(v) over the edges.
+    triangles: number of triangles.
+  The other measures are marked stale after each update and recalculated with
+  graph_measures.Measures the first time they are requested. Changing an
+  igraph graph takes O(n + m), so the changed edges are only applied to it
+  when one of those measures needs it."""
+
+  MAINTAINED = ['measure_average_degree', 'measure_shannon_entropy',
+      'measure_complexity', 'measure_average_neighbor_degree',
+      'measure_assortativity', 'measure_transitivity']
+
+  def __init__(self, graph, **options):
+    """Calculates the sums of the graph.
+
+    Parameters:
+      graph: An undirected igraph graph without loops or multiple edges. It is
+          copied, so later updates do not change it.
+      options: Keyword arguments given to the measure_context.MeasureContext
+          of the stale measures.
+    """
+    if graph.is_directed() or not graph.is_simple():
+      raise Exception('Only simple undirected graphs are supported.')
+    self._graph = graph.copy()
+    # Edges (u, v), with u < v, not applied to the igraph graph yet.
+    self.pending_added = set()
+    self.pending_removed = set()
+    self.options = options
+    size = graph.vcount()
+    self.neighbors = [set() for _ in xrange(size)]
+    for u, v in graph.get_edgelist():
+      self.neighbors[u].add(v)
+      self.neighbors[v].add(u)
+    self.degrees = numpy.array([len(adjacent) for adjacent in self.neighbors],
+        dtype=numpy.int64)
+    self.histogram = numpy.bincount(self.degrees, minlength=2)
+    # Sum of the degrees of the neighbors of each vertex.
+    self.neighbor_sums = numpy.array([sum(self.degrees[w] for w in adjacent)
+        for adjacent in self.neighbors], dtype=numpy.int64)
+    self.S1 = sum(int(k) for k in self.degrees)
+    self.S2 = sum(int(k) ** 2 for k in self.degrees)
+    self.S3 = sum(int(k) ** 3 for k in self.degrees)
+    self.products = sum(int(self.degrees[u]) * int(self.degrees[v])
+        for u, v in graph.get_edgelist())
+    self.triangles = sum(len(self.neighbors[u] & self.neighbors[v])
+        for u, v in graph.get_edgelist()) // 3
+    self.context = None
+    # Values of the measures that are not maintained, until the next update.
+    self.calculated = {}
+
+  def update(self, added=None, removed=None):
+    """Removes and then adds batches of edges.
+
+    Parameters:
+      added: A list of tuples (u, v) with the edges to add(optional).
+      removed: A list of tuples (u, v) with the edges to remove(optional).
+    """
+    added = [(int(u), int(v)) for u, v in (added or [])]
+    removed = [(int(u), int(v)) for u, v in (removed or [])]
+    self.check(added, removed)
+    for u, v in removed:
+      self.unlink(u, v)
+      self.change_degree(u, -1)
+      self.change_degree(v, -1)
+      edge = (min(u, v), max(u, v))
+      if edge in self.pending_added:
+        self.pending_added.remove(edge)
+      else:
+        self.pending_removed.add(edge)
+    for u, v in added:
+      self.change_degree(u, 1)
+      self.change_degree(v, 1)
+      self.link(u, v)
+      edge = (min(u, v), max(u, v))
+      if edge in self.pending_removed:
+        self.pending_removed.remove(edge)
+      else:
+        self.pending_added.add(edge)
+    if self.context is not None:
+      # The eigenvector of the previous graph is a good starting vector.
+      eigenpair = self.context.cache.get('leading_eigenpair')
+      if eigenpair is not None:
+        self.options['eigenvector_guess'] = eigenpair[1]
+    self.context = None
+    self.calculated = {}
+
+  @property
+  def graph(self):
+    """The current igraph graph."""
+    if self.pending_removed:
+      self._graph.delete_edges(self._graph.get_eids(list(self.pending_removed)))
+      self.pending_removed = set()
+    if self.pending_added:
+      self._graph.add_edges(list(self.pending_added))
+      self.pending_added = set()
+    return self._graph
+
+  def check(self, added, removed):
+    """Raises an exception, before anything is changed, if an edge to remove
+    does not exist or an edge to add would be a loop or a multiple edge."""
+    present = {}
+    def exists(edge):
+      if edge not in present:
+        present[edge] = edge[1] in self.neighbors[edge[0]]
+      return present[edge]
+    for u, v in removed:
+      edge = (min(u, v), max(u, v))
+      if not exists(edge):
+        raise Exception('The edge (%d, %d) does not exist.' % (u, v))
+      present[edge] = False
+    for u, v in added:
+      edge = (min(u, v), max(u, v))
+      if u == v or exists(edge):
+        raise Exception('The edge (%d, %d) cannot be added.' % (u, v))
+      present[edge] = True
+
+  def change_degree(self, vertex, delta):
+    """Adds delta to the degree of the vertex, with its current edges."""
+    old = int(self.degrees[vertex])
+    new = old + delta
+    if new >= len(self.histogram):
+      self.histogram = numpy.concatenate([self.histogram,
+          numpy.zeros(len(self.histogram), dtype=self.histogram.dtype)])
+    self.histogram[old] -= 1
+    self.histogram[new] += 1
+    self.degrees[vertex] = new
+    self.S1 += delta
+    self.S2 += new ** 2 - old ** 2
+    self.S3 += new ** 3 - old ** 3
+    self.products += delta * int(self.neighbor_sums[vertex])
+    for w in self.neighbors[vertex]:
+      self.neighbor_sums[w] += delta
+
+  def link(self, u, v):
+    self.triangles += len(self.neighbors[u] & self.neighbors[v])
+    self.neighbors[u].add(v)
+    self.neighbors[v].add(u)
+    self.neighbor_sums[u] += self.degrees[v]
+    self.neighbor_sums[v] += self.degrees[u]
+    self.products += int(self.degrees[u]) * int(self.degrees[v])
+
+  def unlink(self, u, v):
+    self.neighbors[u].discard(v)
+    self.neighbors[v].discard(u)
+    self.triangles -= len(self.neighbors[u] & self.neighbors[v])
+    self.neighbor_sums[u] -= self.degrees[v]
+    self.neighbor_sums[v] -= self.degrees[u]
+    self.products -= int(self.degrees[u]) * int(self.degrees[v])
+
+  def measure_average_degree(self):
+    return float(self.S1) / len(self.degrees)
+
+  def measure_shannon_entropy(self):
+    return stats.entropy(self.histogram[self.histogram > 0])
+
+  def measure_complexity(self):
+    size = len(self.degrees)
+    return float(self.S2) / size - (float(self.S1) / size) ** 2
+
+  def measure_average_neighbor_degree(self):
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+      return numpy.mean(self.neighbor_sums / self.degrees.astype(float))
+
+  def measure_assortativity(self):
+    # Pearson correlation of the degrees at both ends of the edges, where each
+    # edge is counted in both directions.
+    edges = self.S1 // 2
+    if edges == 0:
+      return float('nan')
+    mean = float(self.S2) / self.S1
+    variance = float(self.S3) / self.S1 - mean ** 2
+    if variance == 0:
+      return float('nan')
+    return (float(self.products) / edges - mean ** 2) / variance
+
+  def measure_transitivity(self):
+    triples = (self.S2 - self.S1) // 2
+    if triples == 0:
+      return 0.0
+    return 3.0 * self.triangles / triples
+
+  def value(self, measure):
+    """Returns the value of the measure with the given name, such as
+    'measure_diameter', for the current graph."""
+    if measure in self.MAINTAINED:
+      return getattr(self, measure)()
+    if measure not in self.calculated:
+      if self.context is None:
+        self.context = measure_context.MeasureContext(self.graph,
+            **self.options)
+      method = getattr(graph_measures.Measures, measure)
+      self.calculated[measure] = method(self.graph, self.context)
+    return self.calculated[measure]
+
+  def calculate_measures(self, measures=None):
+    """Returns a list with the values of the given measures (default=all) in
+    the order of graph_measures.Measures.column_names."""
+    return [self.value(name)
+        for name in graph_measures.Measures.column_names(measures)]
@@ -0,0 +1,62 @@
+"""This module calculates the global efficiency of a graph with one breadth
+    first search per source, so the memory is O(n) per source."""
+
+import csr
+import math
+import numpy
+import scipy.stats as stats
+import source_pool
+
+def efficiency_sums(adjacency, sources):
+  """Returns a numpy array with the sum of 1/d(source, v) for each source.
+
+  Parameters:
+    adjacency: A scipy.sparse.csr_matrix built by csr.adjacency_matrix.
+    sources: A list of vertices.
+  """
+  sums = numpy.zeros(len(sources))
+  for index, source in enumerate(sources):
+    _, distances = csr.bfs_distances(adjacency, source)
+    distances = distances[distances > 0]
+    sums[index] = (1.0 / distances).sum()
+  return sums
+
+def global_efficiency(graph, workers=1, samples=None, confidence=0.95,
+    random_state=numpy.random):
+  """Calculates the global efficiency, the average of 1/d(u, v) over all pairs.
+  The direction of the edges of directed graphs is ignored, as in igraph's
+  mode ALL.
+
+  Parameters:
+    graph: An igraph graph.
+    workers: An integer indicating the number of processes(default=1).
+    samples: An integer indicating the number of sources sampled uniformly
+        without replacement(optional). By default all the vertices are used.
+    confidence: A double indicating the confidence level of the interval of
+        the sampled estimate(default=0.95).
+    random_state: A numpy.random.RandomState used to sample the sources.
+
+  Returns:
+    A tuple (efficiency, half_width), where the exact efficiency lies in
+        [efficiency - half_width, efficiency + half_width] with the given
+        confidence. half_width is 0 when all the vertices are used.
+  """
+  size = graph.vcount()
+  if size < 2:
+    return 0.0, 0.0
+  if samples is None or samples >= size:
+    sources = range(size)
+  else:
+    sources = sorted(random_state.choice(size, int(samples), replace=False))
+  chunk_size = max(1, int(math.ceil(len(sources) * 1.0 / (4 * workers))))
+  sums = numpy.concatenate(source_pool.map_sources(graph, efficiency_sums,
+      sources, workers, chunk_size, csr.symmetric_adjacency_matrix))
+  per_source = sums / (size - 1)
+  efficiency = per_source.mean()
+  if len(sources) == size or len(sources) < 2:
+    return efficiency, 0.0
+  # Normal interval with the finite population correction.
+  z = stats.norm.ppf(0.5 + confidence / 2.0)
+  half_width = (z * per_source.std(ddof=1) / math.sqrt(len(sources)) *
+      math.sqrt((size - len(sources)) * 1.0 / (size - 1)))
+  return efficiency, half_width
@@ -2,145 +2,154 @@
 
 import sys
 import igraph
+import csr
 import csv
+import diameter
+import efficiency
+import measure_context
 import numpy
+import profiling
 import scipy.stats as stats
+import search_information
 
 class Measures(object):
   """Class that calculates network measures."""
 
   @classmethod
   def write (cls, csv_row):
-    for item in csv_row:
-      print str(item) + ',',
+    print ','.join(str(item) for item in csv_row)
 
   @classmethod
-  def measure_average_degree(cls, graph):
+  def context(cls, graph, context=None):
+    """Returns the given measure_context.MeasureContext or a new one for the
+    graph."""
+    return context if context is not None else measure_context.MeasureContext(
+        graph)
+
+  @classmethod
+  def measure_average_degree(cls, graph, context=None):
     # Calculate the average degree.
-    degrees = graph.degree(range(0, graph.vcount()))
-    return numpy.mean(degrees)
+    return numpy.mean(cls.context(graph, context).degrees)
 
   @classmethod
-  def measure_shannon_entropy(cls, graph):
+  def measure_shannon_entropy(cls, graph, context=None):
     # Calculate the Shannon Entropy of the degree distribution.
-    degrees = graph.degree(range(0, graph.vcount()))
-    count_dict = {}
-    for deg in degrees:
-      if not deg in count_dict:
-        count_dict[deg] = 0
-      count_dict[deg] += 1
-    count_list = []
-    for _, cnt in count_dict.items():
-      count_list.append(cnt)
-    return stats.entropy(count_list)
-
-  @classmethod
-  def measure_average_betweenness(cls, graph):
+    count_list = numpy.bincount(cls.context(graph, context).degrees)
+    return stats.entropy(count_list[count_list > 0])
+
+  @classmethod
+  def measure_average_betweenness(cls, graph, context=None):
     # Calculate the average and variance of betweenness.
-    betweenness = graph.betweenness()
-    return numpy.mean(betweenness)
+    return numpy.mean(cls.context(graph, context).betweenness)
 
   @classmethod
-  def measure_variance_betweenness(cls, graph):
+  def measure_variance_betweenness(cls, graph, context=None):
     # Calculate the average and variance of betweenness.
-    betweenness = graph.betweenness()
-    return numpy.var(betweenness)
+    return numpy.var(cls.context(graph, context).betweenness)
 
   @classmethod
-  def measure_diameter(cls, graph):
+  def measure_diameter(cls, graph, context=None):
     # Calculate the diameter.
-    return graph.diameter(False)
+    # It is certified with a few breadth first searches, whose number is kept
+    # in the context as "diameter_bfs". When the option "diameter_max_bfs" is
+    # not enough, all the distances are calculated.
+    context = cls.context(graph, context)
+    ans, bfs_runs = diameter.diameter(context.symmetric_adjacency,
+        context.options.get('diameter_max_bfs'))
+    context.cache['diameter_bfs'] = bfs_runs
+    if ans is None:
+      return graph.diameter(False)
+    return ans
 
   @classmethod
-  def measure_assortativity(cls, graph):
+  def measure_assortativity(cls, graph, context=None):
     # Calculate the assortativity.
-    return graph.assortativity_degree(False)
+    if graph.is_directed():
+      return graph.assortativity_degree(False)
+    context = cls.context(graph, context)
+    return csr.degree_assortativity(context.adjacency, context.degrees)
 
   @classmethod
-  def measure_transitivity(cls, graph):
+  def measure_transitivity(cls, graph, context=None):
     # Calculate the clustering coefficient.
     return graph.transitivity_undirected("zero")
 
   @classmethod
-  def measure_efficiency(cls, graph):
+  def measure_efficiency(cls, graph, context=None):
     # Calculate the efficiency.
-    distance_matrix = graph.shortest_paths(mode=igraph.ALL)
-    efficiency = 0
-    for row in distance_matrix:
-      for dist in row:
-        efficiency += (1.0 / dist if dist > 0 else 0)
-    efficiency /= graph.vcount() * (graph.vcount() - 1)
-    return efficiency
+    # The shared distance matrix is used when it is kept by the context.
+    # Otherwise the rows are streamed over the "workers" option processes,
+    # or only "efficiency_samples" sources are used and the half width of the
+    # "confidence" interval is kept in the context as "efficiency_half_width".
+    # When the average search information is also requested, the sums of
+    # both are calculated from the same traversals.
+    context = cls.context(graph, context)
+    samples = context.options.get('efficiency_samples')
+    if (samples is None and
+        'measure_average_search_information' in context.requested):
+      return (context.path_sums[:, 0].sum() /
+          (graph.vcount() * (graph.vcount() - 1)))
+    if samples is None and graph.vcount() <= context.MAX_CACHED_DISTANCES:
+      ans = 0
+      for _, row in context.distance_rows():
+        ans += (1.0 / row[row > 0]).sum()
+      ans /= graph.vcount() * (graph.vcount() - 1)
+      return ans
+    ans, half_width = efficiency.global_efficiency(graph,
+        context.options.get('workers', 1), samples,
+        context.options.get('confidence', 0.95))
+    context.cache['efficiency_half_width'] = half_width
+    return ans
 
   @classmethod
-  def measure_average_coreness(cls, graph):
+  def measure_average_coreness(cls, graph, context=None):
     # Calculate the average coreness.
     return numpy.mean(graph.coreness())
 
   @classmethod
-  def measure_complexity(cls, graph):
+  def measure_complexity(cls, graph, context=None):
     # Calculate the second order moment of the degree.
-    degrees = graph.degree(range(0, graph.vcount()))
-    return stats.moment(degrees, 2)
+    degrees = cls.context(graph, context).degrees
+    return numpy.mean((degrees - degrees.mean()) ** 2)
 
   @classmethod
-  def measure_average_closeness(cls, graph):
+  def measure_average_closeness(cls, graph, context=None):
     return numpy.mean(graph.closeness())
 
   @classmethod
-  def measure_average_neighbor_degree(cls, graph):
+  def measure_average_neighbor_degree(cls, graph, context=None):
     # Calculate the average of the average of the degree of the neighbors
     # of the nodes.
-    ans = 0.0
-    degrees = graph.degree()
-    for i in xrange(graph.vcount()):
-      neighbors = graph.neighbors(i)
-      mean = 0.0
-      for j in neighbors:
-        mean += degrees[j]
-      mean /= len(neighbors)
-      ans += mean
-    ans /= graph.vcount()
-    return ans
+    # The neighbors and the degrees of directed graphs follow both directions
+    # of the edges, as igraph's mode ALL.
+    context = cls.context(graph, context)
+    return numpy.mean(csr.average_neighbor_degrees(
+        context.symmetric_adjacency, context.degrees))
 
   @classmethod
-  def measure_largest_eigenvalue(cls, graph):
-    return graph.eigenvector_centrality(directed=graph.is_directed(), return_eigenvalue=True)[1]
+  def measure_largest_eigenvalue(cls, graph, context=None):
+    return cls.context(graph, context).leading_eigenpair[0]
 
   @classmethod
-  def measure_inverse_largest_eigenvalue(cls, graph):
-    return 1.0/graph.eigenvector_centrality(directed=graph.is_directed(), return_eigenvalue=True)[1]
+  def measure_inverse_largest_eigenvalue(cls, graph, context=None):
+    return cls.context(graph, context).epidemic_threshold
 
   @classmethod
-  def measure_average_search_information(cls, graph):
+  def measure_average_search_information(cls, graph, context=None):
     # Calculates the average search information as explained in 
     # "The Influence of Network Properties on the Synchronization of Kuramoto Oscillators 
     # Quantified by a Bayesian Regression Analysis".
-    degrees = graph.degree()
-    ans = 0
-    dp = [0.0 for _i in xrange(graph.vcount())]
-    for i in xrange(graph.vcount()):
-      distances = graph.shortest_paths(i)[0]
-      # Sort vertices by distance from i.
-      sorted_vertices = [(distances[_i], _i) for _i in xrange(graph.vcount())]
-      sorted_vertices.sort()
-      for dist, curr in sorted_vertices:
-        if dist == 0:
-          dp[curr] = 1.0
-        else:
-          neighbors = graph.neighbors(curr)
-          dp[curr] = 0
-          # For all neighbors in the shortest path.
-          for next in neighbors:
-            if next == i:
-              dp[curr] += 1.0
-            elif distances[next] == distances[curr] - 1:
-              dp[curr] += dp[next] * degrees[next] / (degrees[next] - 1.0)
-          dp[curr] *= 1.0 / degrees[curr]
-      for m in xrange(graph.vcount()):
-        ans += -numpy.log2(degrees[m] * 1.0 / degrees[i] * dp[m])
-    ans /= (graph.vcount() * graph.vcount())
-    return ans
+    # The shared distance matrix is used when it is kept by the context, and
+    # the traversals are shared with the efficiency when it is also requested.
+    # Otherwise the sources are split over the "workers" option processes.
+    context = cls.context(graph, context)
+    shared = (graph.vcount() <= context.MAX_CACHED_DISTANCES or
+        ('measure_efficiency' in context.requested and
+            context.options.get('efficiency_samples') is None))
+    if shared:
+      return context.path_sums[:, 1].sum() / (graph.vcount() ** 2)
+    return search_information.average_search_information(graph,
+        context.options.get('workers', 1))
 
   @classmethod
   def get_methods(cls, method_names):
@@ -156,19 +165,61 @@ class Measures(object):
             and callable(getattr(Measures, method_name))]
 
   @classmethod
-  def calculate_all(cls, graph):
+  def check_names(cls, measures):
+    # Raises a ValueError listing the valid names if some of the given
+    # measures is not a measure method.
+    names = [method[0] for method in cls.all_methods()]
+    unknown = [measure for measure in measures if measure not in names]
+    if unknown:
+      raise ValueError('Unknown measures: %s. Valid measures: %s.' % (
+          ', '.join(unknown), ', '.join(names)))
+
+  @classmethod
+  def column_names(cls, measures=None):
+    # Returns the names of the given measures (default=all) in the order of
+    # the values returned by calculate_measures.
+    if measures is not None:
+      cls.check_names(measures)
+    return [method[0] for method in cls.all_methods()
+        if measures is None or method[0] in measures]
+
+  @classmethod
+  def calculate(cls, method, graph, context):
+    # Calls the measure method (a tuple (name, function)). When the "profile"
+    # option is set, its wall time, cpu time and memory are appended to
+    # context.profile with the size of the graph. Intermediate results shared
+    # through the context are charged to the first measure that uses them.
+    if not context.options.get('profile'):
+      return method[1](graph, context)
+    value, record = profiling.profile_call(method[1], graph, context)
+    record.update(measure=method[0], vertices=graph.vcount(),
+        edges=graph.ecount())
+    context.profile.append(record)
+    return value
+
+  @classmethod
+  def calculate_all(cls, graph, context=None):
+    # Calculates all the measures for the graph, sharing the intermediate
+    # results through a measure_context.MeasureContext.
+    context = cls.context(graph, context)
     methods = cls.all_methods()
-    csv_row = [method[1](graph) for method in methods]
+    context.requested.update(method[0] for method in methods)
+    csv_row = [cls.calculate(method, graph, context) for method in methods]
     return csv_row
 
   @classmethod
-  def calculate_measures(cls, graph, measures):
+  def calculate_measures(cls, graph, measures, context=None):
     # Calculates given measures for the graph.
     # Parameters:
     #   graph: igraph graph
     #   measures: list of strings
+    #   context: measure_context.MeasureContext (optional)
+    cls.check_names(measures)
+    context = cls.context(graph, context)
     methods = cls.all_methods()
-    csv_row = [method[1](graph) for method in methods if method[0] in measures]
+    context.requested.update(measures)
+    csv_row = [cls.calculate(method, graph, context) for method in methods
+        if method[0] in measures]
     return csv_row
 
 if __name__ == '__main__':
@@ -178,4 +229,4 @@ if __name__ == '__main__':
     # Create graph.
     graph = igraph.GraphBase.Read_Edgelist(filename, directed=False)
 
-    print Measures.write(Measures.calculate_all(graph)),
+    Measures.write(Measures.calculate_all(graph))
@@ -0,0 +1,156 @@
+"""This module keeps the intermediate results that are shared by the measures
+    of a graph, so that each one is calculated once."""
+
+import betweenness
+import csr
+import igraph
+import math
+import numpy
+import search_information
+import source_pool
+import spectral
+
+class MeasureContext(object):
+  """Intermediate results of one graph.
+  Each intermediate is calculated the first time a measure requests it, so only
+  the intermediates needed by the requested measures are evaluated."""
+
+  # Maximum number of vertices for which the distance matrix is kept.
+  MAX_CACHED_DISTANCES = 4096
+  # Maximum number of distances calculated at once.
+  BLOCK_SIZE = 1 << 22
+
+  def __init__(self, graph, **options):
+    """Creates the context.
+
+    Parameters:
+      graph: An igraph graph.
+      options: Keyword arguments that configure how the measures are
+          calculated.
+    """
+    self.graph = graph
+    self.options = options
+    self.cache = {}
+    # Names of the measures that will be calculated with the context, so that
+    # measures sharing a traversal calculate it once.
+    self.requested = set()
+    # Records of profiling.profile_call of each measure, when the option
+    # profile is set.
+    self.profile = []
+
+  def get(self, name, function):
+    """Returns the intermediate with the given name, calculating it with
+    function if needed."""
+    if name not in self.cache:
+      self.cache[name] = function()
+    return self.cache[name]
+
+  @property
+  def adjacency(self):
+    """A scipy.sparse.csr_matrix with the adjacency matrix of the graph."""
+    return self.get('adjacency', lambda: csr.adjacency_matrix(self.graph))
+
+  @property
+  def symmetric_adjacency(self):
+    """A scipy.sparse.csr_matrix with the adjacency matrix of the graph
+    ignoring the direction of its edges, as igraph's mode ALL. It is the
+    adjacency matrix for undirected graphs."""
+    if not self.graph.is_directed():
+      return self.adjacency
+    return self.get('symmetric_adjacency',
+        lambda: (self.adjacency + self.adjacency.T).tocsr())
+
+  @property
+  def degrees(self):
+    """A numpy array with the degree of each vertex."""
+    return self.get('degrees', lambda: csr.degrees(self.adjacency)
+        if not self.graph.is_directed() else numpy.array(self.graph.degree()))
+
+  @property
+  def betweenness(self):
+    """A numpy array with the betweenness of each vertex.
+    When any of the options betweenness_samples, betweenness_error or
+    betweenness_time is given, it is estimated from sampled pivots with
+    betweenness.approximate_betweenness, and the number of pivots and the
+    relative error are kept as betweenness_pivots and betweenness_error."""
+    return self.get('betweenness', self.calculate_betweenness)
+
+  def calculate_betweenness(self):
+    samples = self.options.get('betweenness_samples')
+    error = self.options.get('betweenness_error')
+    time_budget = self.options.get('betweenness_time')
+    if samples is None and error is None and time_budget is None:
+      return numpy.array(self.graph.betweenness())
+    values, pivots, relative_error = betweenness.approximate_betweenness(
+        self.graph, self.options.get('workers', 1), samples, error,
+        time_budget)
+    self.cache['betweenness_pivots'] = pivots
+    self.cache['betweenness_error'] = relative_error
+    return values
+
+  @property
+  def leading_eigenpair(self):
+    """A tuple (eigenvalue, eigenvector) with the largest eigenvalue of the
+    adjacency matrix and its eigenvector. The option eigenvector_guess, such
+    as the eigenvector of a similar graph, is used to warm start the solver."""
+    return self.get('leading_eigenpair', lambda: spectral.leading_eigenpair(
+        self.adjacency, self.options.get('eigenvector_guess')))
+
+  @property
+  def epidemic_threshold(self):
+    """The epidemic threshold 1/lambda_max of the graph, which is numpy.inf
+    when lambda_max is 0."""
+    return spectral.inverse_eigenvalue(self.leading_eigenpair[0])
+
+  @property
+  def path_sums(self):
+    """A numpy array with one row [efficiency, search information] per vertex,
+    ignoring the direction of the edges, with the sums of 1/d(source, v) and of the search
+    information over all the vertices v. The kept distance matrix is used for
+    graphs with at most MAX_CACHED_DISTANCES vertices. Otherwise both sums are
+    calculated from one breadth first search per source over the "workers"
+    option processes."""
+    return self.get('path_sums', self.calculate_path_sums)
+
+  def calculate_path_sums(self):
+    size = self.graph.vcount()
+    if size > self.MAX_CACHED_DISTANCES:
+      workers = self.options.get('workers', 1)
+      chunk_size = max(1, int(math.ceil(size * 1.0 / (4 * workers))))
+      return numpy.concatenate(source_pool.map_sources(self.graph,
+          search_information.path_sums, range(size), workers, chunk_size,
+          search_information.prepare))
+    state = search_information.prepare(self.graph)
+    sums = numpy.zeros((size, 2))
+    for source, row in self.distance_rows():
+      sums[source, 0] = (1.0 / row[row > 0]).sum()
+      sums[source, 1] = search_information.source_sum(state, source, row)
+    return sums
+
+  def distance_rows(self):
+    """Generates the distances from each vertex to all the vertices.
+    The distance matrix is kept for graphs with at most MAX_CACHED_DISTANCES
+    vertices, so that other measures reuse it. Otherwise it is calculated in
+    blocks of rows each time.
+
+    Returns:
+      A generator of tuples (source, distances), where distances is a numpy
+          array with numpy.inf for unreachable vertices.
+    """
+    size = self.graph.vcount()
+    if size <= self.MAX_CACHED_DISTANCES:
+      matrix = self.get('distances', lambda: self.distance_block(range(size)))
+      for source in xrange(size):
+        yield source, matrix[source]
+      return
+    rows_per_block = max(1, self.BLOCK_SIZE // max(1, size))
+    for begin in xrange(0, size, rows_per_block):
+      sources = range(begin, min(begin + rows_per_block, size))
+      for source, row in zip(sources, self.distance_block(sources)):
+        yield source, row
+
+  def distance_block(self, sources):
+    """Returns a numpy array with the distances from the sources to all the
+    vertices."""
+    return numpy.array(self.graph.shortest_paths(source=sources,
+        mode=igraph.ALL), dtype=numpy.float64).reshape(len(sources), -1)
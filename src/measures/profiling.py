@@ -0,0 +1,65 @@
+"""This module records the wall time, cpu time and memory used by each measure,
+    and aggregates the records of many graphs."""
+
+import resource
+import time
+
+def usage():
+  """Returns a tuple (cpu_time, process_peak_memory_kb) of this process, where
+  the cpu time includes the finished child processes, such as the workers of a
+  source_pool.SourcePool, and the memory is the largest resident memory since
+  the process started (ru_maxrss)."""
+  own = resource.getrusage(resource.RUSAGE_SELF)
+  children = resource.getrusage(resource.RUSAGE_CHILDREN)
+  return (own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime,
+      own.ru_maxrss)
+
+def profile_call(function, *args):
+  """Calls function with args and measures it.
+
+  Returns:
+    A tuple (value, record), where value is returned by function and record is a
+        dict with wall_time and cpu_time in seconds,
+        process_peak_memory_kb, the largest resident memory of the process
+        since it started, which includes the previous calls and graphs, and
+        memory_growth_kb, how much the call raised that peak. memory_growth_kb
+        is 0 when the call used less memory than an earlier one.
+  """
+  cpu_time, peak_memory = usage()
+  wall_time = time.time()
+  value = function(*args)
+  wall_time = time.time() - wall_time
+  new_cpu_time, new_peak_memory = usage()
+  return value, {'wall_time': wall_time, 'cpu_time': new_cpu_time - cpu_time,
+      'process_peak_memory_kb': new_peak_memory,
+      'memory_growth_kb': new_peak_memory - peak_memory}
+
+def summarize(records):
+  """Aggregates the records of many graphs by measure.
+
+  Parameters:
+    records: A list of dicts with the key measure and the keys of the records
+        of profile_call.
+
+  Returns:
+    A dict from measure name to a dict with the number of calls, the total,
+        mean and maximum wall and cpu times, the maximum process peak memory
+        and memory growth, and the largest graph measured.
+  """
+  summary = {}
+  for record in records:
+    entry = summary.setdefault(record['measure'], {'calls': 0,
+        'total_wall_time': 0.0, 'max_wall_time': 0.0, 'total_cpu_time': 0.0,
+        'max_cpu_time': 0.0, 'max_process_peak_memory_kb': 0,
+        'max_memory_growth_kb': 0, 'max_vertices': 0, 'max_edges': 0})
+    entry['calls'] += 1
+    for name in ('wall_time', 'cpu_time'):
+      entry['total_' + name] += record[name]
+      entry['max_' + name] = max(entry['max_' + name], record[name])
+    for name in ('process_peak_memory_kb', 'memory_growth_kb', 'vertices',
+        'edges'):
+      entry['max_' + name] = max(entry['max_' + name], record.get(name, 0))
+  for entry in summary.values():
+    entry['mean_wall_time'] = entry['total_wall_time'] / entry['calls']
+    entry['mean_cpu_time'] = entry['total_cpu_time'] / entry['calls']
+  return summary
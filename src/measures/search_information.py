@@ -0,0 +1,112 @@
+"""This module calculates the average search information of a graph as
+    explained in "The Influence of Network Properties on the Synchronization of
+    Kuramoto Oscillators Quantified by a Bayesian Regression Analysis".
+    The probability of following a shortest path from a source is propagated
+    one breadth first search layer at a time over the edges of the CSR arrays
+    that lie on shortest paths."""
+
+import csr
+import math
+import numpy
+import source_pool
+
+def prepare(graph):
+  """Returns a tuple (adjacency, degrees, rows) with the CSR adjacency matrix,
+  the degrees of the graph and the row of each entry of the matrix. The
+  direction of the edges of directed graphs is ignored, as in igraph's mode
+  ALL, so the degrees are the total degrees."""
+  adjacency = csr.symmetric_adjacency_matrix(graph)
+  rows = numpy.repeat(numpy.arange(adjacency.shape[0]),
+      numpy.diff(adjacency.indptr))
+  return adjacency, numpy.asarray(adjacency.sum(axis=1)).ravel(), rows
+
+def source_sum(state, source, distances):
+  """Returns the sum of the search information from the source to all the
+  vertices, which is infinite if some vertex is not reached.
+
+  Parameters:
+    state: A tuple (adjacency, degrees, rows) built by prepare.
+    source: An integer indicating the source vertex.
+    distances: A numpy array with the distance from the source to each vertex,
+        negative or numpy.inf for unreached vertices.
+  """
+  adjacency, degrees, rows = state
+  if ((distances < 0) | ~numpy.isfinite(distances)).any():
+    return numpy.inf
+  distances = distances.astype(numpy.int64)
+  columns = adjacency.indices
+  # Entries (u, v) where v is one layer further than u, sorted by the layer and
+  # the vertex v, so that each layer and each vertex are contiguous.
+  on_paths = numpy.flatnonzero(distances[columns] == distances[rows] + 1)
+  targets = columns[on_paths]
+  order = numpy.lexsort((targets, distances[targets]))
+  on_paths, targets = on_paths[order], targets[order]
+  sources = rows[on_paths]
+  multiplicities = adjacency.data[on_paths]
+  layer_bounds = numpy.searchsorted(distances[targets],
+      numpy.arange(1, distances.max() + 2))
+  # dp[v] is the probability of reaching v from the source through a shortest
+  # path and weights holds the contribution of each vertex to the next layer.
+  dp = numpy.zeros(len(degrees))
+  weights = numpy.zeros(len(degrees))
+  dp[source] = 1.0
+  weights[source] = 1.0
+  with numpy.errstate(divide='ignore', invalid='ignore'):
+    for begin, end in zip(layer_bounds[:-1], layer_bounds[1:]):
+      if begin == end:
+        continue
+      layer_targets = targets[begin:end]
+      starts = numpy.flatnonzero(numpy.concatenate([[True],
+          layer_targets[1:] != layer_targets[:-1]]))
+      vertices = layer_targets[starts]
+      dp[vertices] = numpy.add.reduceat(multiplicities[begin:end] *
+          weights[sources[begin:end]], starts) / degrees[vertices]
+      # Vertices of degree 1 never precede a vertex in the next layer.
+      weights[vertices] = (dp[vertices] * degrees[vertices] /
+          (degrees[vertices] - 1.0))
+  return -numpy.log2(degrees * dp / degrees[source]).sum()
+
+def search_information_sums(state, sources):
+  """Returns a numpy array with the sum of the search information from each
+  source to all the vertices.
+
+  Parameters:
+    state: A tuple (adjacency, degrees, rows) built by prepare.
+    sources: A list of vertices.
+  """
+  return path_sums(state, sources)[:, 1]
+
+def path_sums(state, sources):
+  """Returns a numpy array with one row [efficiency, search information] per
+  source, with the sums of 1/d(source, v) and of the search information from
+  the source to all the vertices, calculated from the same breadth first
+  search.
+
+  Parameters:
+    state: A tuple (adjacency, degrees, rows) built by prepare.
+    sources: A list of vertices.
+  """
+  sums = numpy.zeros((len(sources), 2))
+  for index, source in enumerate(sources):
+    _, distances = csr.bfs_distances(state[0], source)
+    reached = distances[distances > 0]
+    sums[index, 0] = (1.0 / reached).sum()
+    sums[index, 1] = source_sum(state, source, distances)
+  return sums
+
+def average_search_information(graph, workers=1):
+  """Calculates the average search information over all pairs of vertices,
+  which is infinite when the graph is not connected.
+
+  Parameters:
+    graph: An igraph graph.
+    workers: An integer indicating the number of processes(default=1).
+
+  Returns:
+    A double that is the average search information.
+  """
+  size = graph.vcount()
+  chunk_size = max(1, int(math.ceil(size * 1.0 / (4 * workers))))
+  sums = numpy.concatenate([numpy.zeros(0)] + source_pool.map_sources(graph,
+      search_information_sums, range(size), workers, chunk_size, prepare))
+  return sums.sum() / (size * size)
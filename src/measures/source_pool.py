@@ -0,0 +1,95 @@
+"""This module runs computations that are independent for each source vertex of
+    a graph in a pool of processes."""
+
+import igraph
+import multiprocessing
+
+# State of the worker processes: the result of prepare(graph).
+_STATE = None
+
+def _initialize(vcount, edges, is_directed, prepare):
+  global _STATE
+  graph = igraph.Graph(n=vcount, edges=edges, directed=is_directed)
+  _STATE = prepare(graph) if prepare else graph
+
+def _run(task):
+  function, sources = task
+  return function(_STATE, sources)
+
+class SourcePool(object):
+  """Pool of processes that hold a graph.
+  The graph is sent to each worker once, instead of once per chunk of sources,
+  and the pool can be used for several batches of sources."""
+
+  def __init__(self, graph, workers=1, prepare=None):
+    """Starts the workers.
+
+    Parameters:
+      graph: An igraph graph.
+      workers: An integer indicating the number of processes(default=1). With
+          1 worker the chunks are processed in this process.
+      prepare: A module level function that transforms the graph before the
+          chunks are processed, such as building arrays(optional).
+    """
+    self.workers = workers
+    self.pool = None
+    self.state = None
+    if workers == 1:
+      self.state = prepare(graph) if prepare else graph
+    else:
+      self.pool = multiprocessing.Pool(workers, _initialize, (graph.vcount(),
+          graph.get_edgelist(), graph.is_directed(), prepare))
+
+  def map(self, function, sources, chunk_size=1024):
+    """Applies function to chunks of the sources.
+
+    Parameters:
+      function: A module level function function(state, sources), where state
+          is the graph or prepare(graph).
+      sources: A list of vertices.
+      chunk_size: An integer indicating the number of sources of each chunk.
+
+    Returns:
+      A list with the result of each chunk, in the order of the sources.
+    """
+    chunks = [sources[begin:begin + chunk_size]
+        for begin in xrange(0, len(sources), chunk_size)]
+    if self.pool is None:
+      return [function(self.state, chunk) for chunk in chunks]
+    return self.pool.map(_run, [(function, chunk) for chunk in chunks],
+        chunksize=1)
+
+  def close(self):
+    """Stops the workers."""
+    if self.pool is not None:
+      self.pool.close()
+      self.pool.join()
+      self.pool = None
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *args):
+    self.close()
+
+def map_sources(graph, function, sources, workers=1, chunk_size=1024,
+    prepare=None):
+  """Applies function to chunks of the sources in a SourcePool.
+
+  Parameters:
+    graph: An igraph graph.
+    function: A module level function function(state, sources), where state is
+        the graph or prepare(graph).
+    sources: A list of vertices.
+    workers: An integer indicating the number of processes(default=1).
+    chunk_size: An integer indicating the number of sources of each chunk.
+    prepare: A module level function that transforms the graph before the
+        chunks are processed(optional).
+
+  Returns:
+    A list with the result of each chunk, in the order of the sources.
+  """
+  if workers != 1 and len(sources) <= chunk_size:
+    workers = 1
+  with SourcePool(graph, workers, prepare) as pool:
+    return pool.map(function, sources, chunk_size)
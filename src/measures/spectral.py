@@ -0,0 +1,122 @@
+"""This module calculates the leading eigenpair of the adjacency matrix of a
+    graph with a sparse Lanczos/Arnoldi (ARPACK) solver. Its result is checked
+    against the Perron-Frobenius properties of non negative matrices and
+    recalculated with igraph when it does not hold them."""
+
+import igraph
+import numpy
+import scipy.sparse.csgraph as csgraph
+import scipy.sparse.linalg as linalg
+
+# Graphs with at most this number of vertices are solved with dense matrices,
+# since ARPACK needs more vertices than requested eigenvalues.
+MAX_DENSE_SIZE = 16
+# Relative residual |Av - lambda v| accepted for the eigenpair of the solver,
+# and eigenvalues below it are taken as 0.
+RESIDUAL_TOLERANCE = 1e-8
+
+def leading_eigenpair(adjacency, initial_vector=None, tolerance=0):
+  """Calculates the largest eigenvalue of the adjacency matrix and its
+  eigenvector.
+
+  Parameters:
+    adjacency: A scipy.sparse.csr_matrix built by csr.adjacency_matrix.
+    initial_vector: A numpy array used as the starting vector(optional), such
+        as the eigenvector of a graph that differs in a few edges. It is
+        ignored when its size does not match.
+    tolerance: A double indicating the relative accuracy of the eigenvalue
+        (default=0, the machine precision).
+
+  Returns:
+    A tuple (eigenvalue, eigenvector), where the eigenvector has unit norm and
+        non negative entries.
+  """
+  size = adjacency.shape[0]
+  if size == 0:
+    return 0.0, numpy.zeros(0)
+  symmetric = (adjacency != adjacency.T).nnz == 0
+  if not symmetric and is_acyclic(adjacency):
+    # The matrix is nilpotent, where the solvers return spurious eigenvalues.
+    # The vertices without incoming edges span eigenvectors of 0.
+    vector = (numpy.asarray(adjacency.sum(axis=0)).ravel() == 0) * 1.0
+    return 0.0, vector / numpy.linalg.norm(vector)
+  try:
+    value, vector = solve(adjacency, symmetric, initial_vector, tolerance)
+  except linalg.ArpackNoConvergence:
+    value, vector = None, None
+  if value is None or not is_leading(adjacency, value, vector, tolerance):
+    value, vector = igraph_eigenpair(adjacency)
+  if vector.sum() < 0:
+    vector = -vector
+  return value, vector / numpy.linalg.norm(vector)
+
+def solve(adjacency, symmetric, initial_vector=None, tolerance=0):
+  """Returns a tuple (eigenvalue, eigenvector) with the eigenvalue of largest
+  real part of the adjacency matrix, or (None, None) when it is not real."""
+  size = adjacency.shape[0]
+  if size <= MAX_DENSE_SIZE:
+    dense = adjacency.toarray()
+    if symmetric:
+      values, vectors = numpy.linalg.eigh(dense)
+    else:
+      values, vectors = numpy.linalg.eig(dense)
+    index = numpy.argmax(values.real)
+    value, vector = values[index], vectors[:, index]
+  else:
+    v0 = None
+    if initial_vector is not None and len(initial_vector) == size:
+      # ARPACK fails on vectors orthogonal to the solution, so every entry is
+      # made positive like the Perron vector.
+      v0 = numpy.abs(initial_vector) + 1e-6
+    if symmetric:
+      values, vectors = linalg.eigsh(adjacency, k=1, which='LA', v0=v0,
+          tol=tolerance)
+    else:
+      values, vectors = linalg.eigs(adjacency, k=1, which='LR', v0=v0,
+          tol=tolerance)
+    value, vector = values[0], vectors[:, 0]
+  if abs(numpy.imag(value)) > RESIDUAL_TOLERANCE * max(1.0, abs(value)):
+    return None, None
+  vector = numpy.real(vector)
+  if vector.sum() < 0:
+    vector = -vector
+  return numpy.real(value), vector / numpy.linalg.norm(vector)
+
+def is_acyclic(adjacency):
+  """Returns True if the graph of the adjacency matrix has no directed cycles,
+  that is, every strongly connected component is a vertex without a loop."""
+  components, _ = csgraph.connected_components(adjacency, directed=True,
+      connection='strong')
+  return components == adjacency.shape[0] and not adjacency.diagonal().any()
+
+def is_leading(adjacency, value, vector, tolerance=0):
+  """Returns True if (value, vector) can be the Perron eigenpair of the non
+  negative adjacency matrix: a non negative eigenvalue with a small residual
+  and an eigenvector with non negative entries."""
+  scale = max(1.0, abs(value))
+  limit = max(tolerance, RESIDUAL_TOLERANCE) * scale
+  residual = numpy.linalg.norm(adjacency.dot(vector) - value * vector)
+  return (residual <= limit and value >= -limit and
+      vector.min() >= -numpy.sqrt(limit))
+
+def igraph_eigenpair(adjacency):
+  """Returns a tuple (eigenvalue, eigenvector) calculated by igraph's
+  eigenvector centrality, with the entries of the matrix as weights."""
+  entries = adjacency.tocoo()
+  # igraph's centrality follows the incoming edges, so the graph is reversed.
+  graph = igraph.Graph(adjacency.shape[0], zip(entries.col.tolist(),
+      entries.row.tolist()), directed=True)
+  vector, value = graph.eigenvector_centrality(directed=True, scale=False,
+      weights=entries.data.tolist(), return_eigenvalue=True)
+  return value, numpy.array(vector)
+
+def inverse_eigenvalue(value):
+  """Returns 1/value, which is numpy.inf for eigenvalues that are 0."""
+  if abs(value) <= RESIDUAL_TOLERANCE:
+    return numpy.inf
+  return 1.0 / value
+
+def epidemic_threshold(adjacency, initial_vector=None):
+  """Returns the epidemic threshold 1/lambda_max of the graph, which is
+  numpy.inf when lambda_max is 0."""
+  return inverse_eigenvalue(leading_eigenpair(adjacency, initial_vector)[0])
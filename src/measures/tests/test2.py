@@ -0,0 +1,163 @@
+""" This file tests the efficiency, search information and betweenness engines of
+the graph measures module."""
+import sys
+sys.path.insert(0, "../")
+import betweenness
+import csr
+import diameter
+import dynamic_measures
+import efficiency
+import graph_measures
+import igraph
+import measure_context
+import numpy
+import search_information
+
+def main():
+  graph = igraph.GraphBase.Barabasi(2000, 3)
+  exact = graph_measures.Measures.measure_efficiency(graph)
+  streamed, _ = efficiency.global_efficiency(graph)
+  parallel, _ = efficiency.global_efficiency(graph, workers=4)
+  print exact, streamed, parallel
+  assert numpy.isclose(exact, streamed) and numpy.isclose(exact, parallel)
+
+  context = measure_context.MeasureContext(graph, efficiency_samples=200,
+      workers=2)
+  sampled = graph_measures.Measures.measure_efficiency(graph, context)
+  half_width = context.cache['efficiency_half_width']
+  print sampled, '+-', half_width
+  assert abs(sampled - exact) < 2 * half_width
+
+  # Directed graphs ignore the direction, also above MAX_CACHED_DISTANCES.
+  size = measure_context.MeasureContext.MAX_CACHED_DISTANCES + 100
+  graph = igraph.Graph.Erdos_Renyi(size, 3.0 / size, directed=True)
+  exact = 0
+  for begin in xrange(0, size, 500):
+    rows = numpy.array(graph.shortest_paths(source=range(begin,
+        min(begin + 500, size)), mode=igraph.ALL), dtype=float)
+    exact += (1.0 / rows[rows > 0]).sum()
+  exact /= size * (size - 1)
+  directed = graph_measures.Measures.measure_efficiency(graph)
+  print exact, directed
+  assert numpy.isclose(exact, directed)
+
+  # Value of the previous implementation for ex1.
+  ex = 'resources/ex1.edgelist'
+  graph = igraph.GraphBase.Read_Edgelist(ex, directed=False)
+  serial = search_information.average_search_information(graph)
+  parallel = search_information.average_search_information(graph, workers=2)
+  print serial, parallel
+  assert numpy.isclose(serial, 1.4605961843421107)
+  assert numpy.isclose(serial, parallel)
+
+  # Directed graphs ignore the direction, as the undirected graph with the
+  # same edges.
+  graph = igraph.Graph.Ring(40, directed=True)
+  ring = graph_measures.Measures.measure_average_search_information(graph)
+  graph = igraph.Graph.Erdos_Renyi(150, 0.05, directed=True)
+  directed = search_information.average_search_information(graph)
+  undirected = search_information.average_search_information(
+      graph.as_undirected(mode='each'))
+  print ring, directed, undirected
+  assert numpy.isclose(ring, 0.95) and numpy.isclose(directed, undirected)
+
+  # Both measures from the same traversals, with and without the distance
+  # matrix of the context.
+  graph = igraph.GraphBase.Barabasi(300, 2)
+  names = ['measure_average_search_information', 'measure_efficiency']
+  expected = [search_information.average_search_information(graph),
+      efficiency.global_efficiency(graph)[0]]
+  for cached in [300, 100]:
+    context = measure_context.MeasureContext(graph)
+    context.MAX_CACHED_DISTANCES = cached
+    shared = graph_measures.Measures.calculate_measures(graph, names, context)
+    print expected, shared
+    assert numpy.allclose(expected, shared)
+
+  graph = igraph.GraphBase.Barabasi(500, 2)
+  exact = numpy.array(graph.betweenness())
+  values, pivots, _ = betweenness.approximate_betweenness(graph, workers=2)
+  print pivots, numpy.abs(values - exact).max()
+  assert pivots == 500 and numpy.allclose(values, exact)
+
+  # Shortest paths of directed graphs are counted from the predecessors.
+  graph = igraph.Graph.Erdos_Renyi(200, 0.03, directed=True)
+  exact = numpy.array(graph.betweenness())
+  values, pivots, _ = betweenness.approximate_betweenness(graph, workers=2)
+  sampled, _, relative_error = betweenness.approximate_betweenness(graph,
+      samples=100)
+  print exact.mean(), values.mean(), sampled.mean(), '+-', relative_error
+  assert numpy.allclose(values, exact)
+  assert abs(sampled.mean() - exact.mean()) < 4 * relative_error * exact.mean()
+
+  graph = igraph.Graph.Barabasi(1000, 2)
+  _, eigenvalue = graph.eigenvector_centrality(return_eigenvalue=True)
+  context = measure_context.MeasureContext(graph)
+  largest, vector = context.leading_eigenpair
+  graph.rewire(10)
+  warm = measure_context.MeasureContext(graph, eigenvector_guess=vector)
+  print eigenvalue, largest, warm.leading_eigenpair[0]
+  assert numpy.isclose(eigenvalue, largest)
+  assert numpy.isclose(warm.leading_eigenpair[0],
+      graph.eigenvector_centrality(return_eigenvalue=True)[1])
+
+  # The adjacency matrix of a directed acyclic graph is nilpotent.
+  graph = igraph.Graph.Barabasi(1000, 2, directed=True)
+  largest = graph_measures.Measures.measure_largest_eigenvalue(graph)
+  inverse = graph_measures.Measures.measure_inverse_largest_eigenvalue(graph)
+  print largest, inverse
+  assert largest == 0 and numpy.isinf(inverse)
+
+  graph = igraph.Graph.Erdos_Renyi(3000, 0.0005)
+  context = measure_context.MeasureContext(graph)
+  value, bfs_runs = diameter.diameter(context.adjacency)
+  print value, bfs_runs
+  assert value == graph.diameter(False)
+
+  # Scale free graphs have a central root but large fringes.
+  graph = igraph.Graph.Barabasi(20000, 4)
+  value, bfs_runs = diameter.diameter(csr.adjacency_matrix(graph))
+  print value, bfs_runs
+  assert bfs_runs <= 100
+
+  graph = igraph.Graph.Barabasi(500, 3)
+  dynamic = dynamic_measures.DynamicMeasures(graph)
+  removed = graph.get_edgelist()[:50]
+  added = [(u, v) for u, v in zip(range(0, 500, 2), range(1, 500, 2))
+      if not graph.are_connected(u, v)]
+  dynamic.update(added, removed)
+  dynamic.update(removed[:10], added[:10])
+  incremental = dynamic.calculate_measures(dynamic.MAINTAINED)
+  recalculated = graph_measures.Measures.calculate_measures(dynamic.graph,
+      dynamic.MAINTAINED)
+  print incremental
+  assert numpy.allclose(incremental, recalculated)
+
+  # The neighbors of directed graphs follow both directions of the edges.
+  graph = igraph.Graph.Barabasi(500, 3, directed=True)
+  degrees = graph.degree()
+  expected = numpy.mean([numpy.mean([degrees[w] for w in graph.neighbors(v)])
+      for v in xrange(graph.vcount())])
+  average = graph_measures.Measures.measure_average_neighbor_degree(graph)
+  print expected, average
+  assert numpy.isclose(expected, average)
+
+  # The degrees of regular graphs do not vary, so their correlation is nan.
+  for graph in [igraph.Graph.Full(7), igraph.Graph.Watts_Strogatz(1, 100, 3, 0),
+      igraph.Graph.Ring(30)]:
+    value = graph_measures.Measures.measure_assortativity(graph)
+    print value
+    assert numpy.isnan(value) and numpy.isnan(graph.assortativity_degree(False))
+  graph = igraph.Graph.Barabasi(2000, 3)
+  assert numpy.isclose(graph_measures.Measures.measure_assortativity(graph),
+      graph.assortativity_degree(False))
+
+  try:
+    graph_measures.Measures.column_names(['measure_diameter', 'measure_diamter'])
+    assert False
+  except ValueError as error:
+    print error
+    assert 'measure_diamter' in str(error) and 'measure_diameter' in str(error)
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,101 @@
+"""This module implements a Fenwick tree (binary indexed tree) used to sample
+    indices with probability proportional to weights that change over time."""
+
+class FenwickTree(object):
+  """Fenwick tree over non negative weights.
+  Updating a weight and sampling an index proportionally to the weights take
+  O(log n)."""
+
+  def __init__(self, weights):
+    """Builds the tree in O(n).
+
+    Parameters:
+      weights: A list of non negative numbers with the initial weights.
+    """
+    self.size = len(weights)
+    self.weights = [float(weight) for weight in weights]
+    self.tree = [0.0] + self.weights
+    for i in xrange(1, self.size + 1):
+      parent = i + (i & -i)
+      if parent <= self.size:
+        self.tree[parent] += self.tree[i]
+    self.total = sum(self.weights)
+    self.top_bit = 1
+    while self.top_bit * 2 <= self.size:
+      self.top_bit *= 2
+
+  def add(self, index, delta):
+    """Adds delta to the weight of the given index."""
+    self.weights[index] += delta
+    self.total += delta
+    i = index + 1
+    while i <= self.size:
+      self.tree[i] += delta
+      i += i & -i
+
+  def find(self, value):
+    """Returns the smallest index whose prefix sum of weights is larger than
+    value."""
+    position = 0
+    bit = self.top_bit
+    while bit:
+      next_position = position + bit
+      if next_position <= self.size and self.tree[next_position] <= value:
+        position = next_position
+        value -= self.tree[next_position]
+      bit >>= 1
+    return min(position, self.size - 1)
+
+  def sample(self, random_state):
+    """Samples an index with probability proportional to its weight.
+
+    Parameters:
+      random_state: A numpy.random.RandomState used to draw the sample.
+
+    Returns:
+      An integer that is the sampled index.
+    """
+    if self.total <= 0:
+      raise Exception('The total weight is not positive.')
+    return self.find(random_state.uniform() * self.total)
+
+  def sample_distinct(self, random_state, count):
+    """Samples count distinct indices, each one with probability proportional
+    to its weight among the ones not sampled yet.
+
+    Parameters:
+      random_state: A numpy.random.RandomState used to draw the samples.
+      count: An integer indicating the number of indices.
+
+    Returns:
+      A list of integers that are the sampled indices.
+    """
+    chosen = []
+    chosen_weight = 0.0
+    while len(chosen) < count:
+      if chosen_weight * 2 > self.total:
+        # Rejections are likely, so the chosen weights are removed instead.
+        return chosen + self._sample_removing(random_state, count - len(chosen),
+            chosen)
+      index = self.sample(random_state)
+      if index not in chosen:
+        chosen.append(index)
+        chosen_weight += self.weights[index]
+    return chosen
+
+  def _sample_removing(self, random_state, count, excluded):
+    """Samples count distinct indices that are not excluded, removing the
+    weight of each sampled index while the other ones are sampled."""
+    chosen = []
+    removed = []
+    for index in excluded:
+      removed.append(self.weights[index])
+      self.add(index, -self.weights[index])
+    for _ in xrange(count):
+      index = self.sample(random_state)
+      chosen.append(index)
+      removed.append(self.weights[index])
+      self.add(index, -self.weights[index])
+    for index, weight in zip(list(excluded) + chosen, removed):
+      self.add(index, weight)
+    return chosen
@@ -0,0 +1,136 @@
+"""This module implements an on-disk cache of generated networks."""
+
+import hashlib
+import igraph
+import numpy
+import os
+import zipfile
+
+class NetworkCache(object):
+  """Cache of networks keyed by the arguments of NetworkGenerator.generate.
+  Each network is stored as a compressed numpy file with its edge array. When
+  the cache is larger than max_bytes, the least recently used networks are
+  removed."""
+
+  EXTENSION = '.npz'
+
+  def __init__(self, directory, max_bytes=1 << 30):
+    """Opens the cache, creating the directory when needed.
+
+    Parameters:
+      directory: A string indicating the directory where the networks are
+          stored.
+      max_bytes: An integer indicating the maximum size of the cache in bytes.
+    """
+    self.directory = directory
+    self.max_bytes = max_bytes
+    self.hits = 0
+    self.misses = 0
+    self.evictions = 0
+    if not os.path.isdir(directory):
+      os.makedirs(directory)
+
+  @classmethod
+  def key(cls, type_of_network, size_of_network, parameter_list, seed):
+    """Returns a string that identifies the network generated with the given
+    arguments. Numpy arrays are hashed with all their values, since repr
+    abbreviates large arrays."""
+    digest = hashlib.sha1()
+    cls._update(digest, [type_of_network, size_of_network,
+        list(parameter_list), seed])
+    return digest.hexdigest()
+
+  @classmethod
+  def _update(cls, digest, value):
+    """Adds an unambiguous serialization of value to digest."""
+    if isinstance(value, numpy.ndarray):
+      digest.update(('ndarray %s %r;' % (value.dtype.str, value.shape)).encode(
+          'utf-8'))
+      digest.update(numpy.ascontiguousarray(value).tobytes())
+    elif isinstance(value, (list, tuple)):
+      digest.update(('%s %d;' % (type(value).__name__, len(value))).encode(
+          'utf-8'))
+      for item in value:
+        cls._update(digest, item)
+    else:
+      description = repr(value)
+      digest.update(('%d %s;' % (len(description), description)).encode(
+          'utf-8'))
+
+  def path(self, key):
+    """Returns the filename of the network with the given key."""
+    return os.path.join(self.directory, key + self.EXTENSION)
+
+  def get(self, key):
+    """Returns the cached igraph graph with the given key or None."""
+    path = self.path(key)
+    try:
+      data = numpy.load(path)
+      graph = igraph.Graph(n=int(data['vcount']), edges=data['edges'].tolist(),
+          directed=bool(data['directed']))
+      data.close()
+    except IOError:
+      self.misses += 1
+      return None
+    except (zipfile.BadZipfile, ValueError, KeyError, EOFError):
+      # The file is truncated or corrupt, so it is removed and regenerated.
+      self.misses += 1
+      try:
+        os.remove(path)
+      except OSError:
+        pass
+      return None
+    # Mark the network as recently used.
+    os.utime(path, None)
+    self.hits += 1
+    return graph
+
+  def put(self, key, graph):
+    """Stores an igraph graph with the given key and evicts old networks."""
+    dtype = numpy.int32 if graph.vcount() < 2 ** 31 else numpy.int64
+    edges = numpy.array(graph.get_edgelist(), dtype=dtype).reshape(-1, 2)
+    # Write to a temporary file first, so that other processes never read a
+    # partial network.
+    temporary_path = '%s.%d.tmp' % (self.path(key), os.getpid())
+    with open(temporary_path, 'wb') as temporary_file:
+      numpy.savez_compressed(temporary_file, vcount=graph.vcount(), edges=edges,
+          directed=graph.is_directed())
+    os.rename(temporary_path, self.path(key))
+    self.evict()
+
+  def entries(self):
+    """Returns a list of tuples (last_use, size, path) of the cached networks."""
+    entries = []
+    for filename in os.listdir(self.directory):
+      if not filename.endswith(self.EXTENSION):
+        continue
+      path = os.path.join(self.directory, filename)
+      try:
+        status = os.stat(path)
+      except OSError:
+        continue
+      entries.append((status.st_mtime, status.st_size, path))
+    return entries
+
+  def evict(self):
+    """Removes the least recently used networks until the cache fits in
+    max_bytes."""
+    entries = sorted(self.entries())
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in entries:
+      if total <= self.max_bytes:
+        break
+      try:
+        os.remove(path)
+      except OSError:
+        continue
+      total -= size
+      self.evictions += 1
+
+  def stats(self):
+    """Returns a dict with the hits, misses and evictions of this process and
+    the number of networks and bytes in the cache."""
+    entries = self.entries()
+    return {'hits': self.hits, 'misses': self.misses,
+        'evictions': self.evictions, 'entries': len(entries),
+        'bytes': sum(size for _, size, _ in entries)}
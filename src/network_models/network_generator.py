@@ -4,8 +4,13 @@
 import igraph
 import numpy
 import matplotlib.pyplot as pyplot
+import fenwick_tree
 import math
+import multiprocessing
+import random
+import spatial_grid
 import sys
+from contextlib import contextmanager
 
 class NetworkGenerator(object):
   """Network generator."""
@@ -13,19 +18,44 @@ class NetworkGenerator(object):
   GENERATOR_DICT_KEYS = ["BA", "ER", "WS", "SF2ER", "Waxman", "SpatialSF",
       "DegreeSequence", "ConfigurationSF"]
   RANDOM = numpy.random.RandomState()
+  # Maximum number of random values drawn at once by the vectorized generators.
+  BLOCK_SIZE = 1 << 20
+  # Maximum number of attempts to draw a connected graph.
+  MAX_CONNECTION_RETRIES = 10
+  # Inverse of the maximum fraction of new nodes per block of stream_BA.
+  ATTACHMENT_BLOCK_RATIO = 64
+  # A network_cache.NetworkCache used by generate when a seed is given.
+  CACHE = None
 
   @classmethod
-  def generate(cls, type_of_network, size_of_network, parameter_list):
+  def generate(cls, type_of_network, size_of_network, parameter_list,
+      seed=None):
     """Generates a network of the given type and with the given parameters.
     Parameters:
       type_of_network: An integer that represents the desired model for the
           network.
       size_of_network: An integer indicating the number of nodes in the network.
       parameter_list: A list of parameters for the given type.
+      seed: An integer or a list of integers used to seed the random number
+          generators during the generation(optional). When CACHE is set, seeded
+          networks are read from and written to it.
 
     Returns:
       An igraph graph that is the generated network.
     """
+    if seed is not None:
+      key = None
+      if cls.CACHE is not None:
+        key = cls.CACHE.key(type_of_network, size_of_network, parameter_list,
+            seed)
+        g = cls.CACHE.get(key)
+        if g is not None:
+          return g
+      with cls.seeded(seed):
+        g = cls.generate(type_of_network, size_of_network, parameter_list)
+      if key is not None:
+        cls.CACHE.put(key, g)
+      return g
     generator_dict = {
         "BA": cls.generate_BA,
         "BA_avg": cls.generate_BA_with_average_degree,
@@ -42,6 +72,70 @@ class NetworkGenerator(object):
         "ConfigurationSF": cls.generate_ConfigurationSF}
     return generator_dict[type_of_network](size_of_network, parameter_list)
 
+  @classmethod
+  @contextmanager
+  def seeded(cls, seed):
+    """Replaces RANDOM and the random number generator of igraph by generators
+    seeded with the given seed while the context is active.
+
+    Parameters:
+      seed: An integer or a list of integers. Different lists give independent
+          streams, so [seed, replica] gives one stream per replica.
+    """
+    previous_random = cls.RANDOM
+    cls.RANDOM = numpy.random.RandomState(seed)
+    igraph.set_random_number_generator(
+        random.Random(cls.RANDOM.randint(2 ** 31)))
+    try:
+      yield cls.RANDOM
+    finally:
+      cls.RANDOM = previous_random
+      igraph.set_random_number_generator(random)
+
+  @classmethod
+  def generate_ensemble(cls, type_of_network, size_of_network, parameter_list,
+      replicas, workers=None, seed=None, output_pattern=None):
+    """Generates replicas of a network in a pool of processes.
+    The replica i is generated with the seed [seed, i], so the ensemble is
+    reproducible and does not depend on the number of workers.
+
+    Parameters:
+      type_of_network: A string that represents the desired model for the
+          network, as in generate.
+      size_of_network: An integer indicating the number of nodes in the network.
+      parameter_list: A list of parameters for the given type.
+      replicas: An integer indicating the number of networks.
+      workers: An integer indicating the number of processes(default=number of
+          cpus). With 1 worker, the networks are generated in this process.
+      seed: An integer used to seed the ensemble(optional).
+      output_pattern: A string with a %d that is replaced by the replica
+          number(optional). When given, each network is written as an
+          edgelist to that file and only the filenames are returned.
+
+    Returns:
+      A list with the igraph graphs or the filenames, in order of replica.
+    """
+    if seed is None:
+      seed = numpy.random.RandomState().randint(2 ** 31)
+    tasks = [(type_of_network, size_of_network, parameter_list, [seed, replica],
+        output_pattern % replica if output_pattern else None)
+        for replica in xrange(replicas)]
+    if workers == 1:
+      results = [_generate_replica(task) for task in tasks]
+    else:
+      pool = multiprocessing.Pool(workers)
+      try:
+        results = pool.map(_generate_replica, tasks, chunksize=1)
+      finally:
+        pool.close()
+        pool.join()
+    if output_pattern:
+      return results
+    # Graphs created by igraph.GraphBase can not be pickled, so the workers
+    # send back their edges.
+    return [igraph.Graph(n=vcount, edges=edges, directed=directed)
+        for vcount, edges, directed in results]
+
   @classmethod
   def generate_BA(cls, size_of_network, parameter_list):
     """Generates a graph based on the Barabasi-Albert model.
@@ -87,9 +181,57 @@ class NetworkGenerator(object):
         [int(number_of_outgoing_edges), parameter_list[1], parameter_list[2]
         if len(parameter_list) > 2 else 1])
   
+  @classmethod
+  def _sample_pair_indices(cls, number_of_pairs, p):
+    """Samples each of the pairs 0, ..., number_of_pairs-1 with probability p.
+    The gaps between accepted pairs are geometric, so they are drawn directly
+    instead of visiting every pair, which takes O(number_of_accepted_pairs).
+
+    Parameters:
+      number_of_pairs: An integer indicating the number of candidate pairs.
+      p: A double indicating the probability of accepting each pair.
+
+    Returns:
+      A generator of sorted numpy arrays with the indices of the accepted pairs.
+    """
+    if p <= 0 or number_of_pairs <= 0:
+      return
+    if p >= 1:
+      for begin in xrange(0, number_of_pairs, cls.BLOCK_SIZE):
+        yield numpy.arange(begin, min(begin + cls.BLOCK_SIZE, number_of_pairs))
+      return
+    last = -1
+    while last < number_of_pairs:
+      # Draw a little more gaps than expected to reach the end in one block.
+      expected = p * (number_of_pairs - last - 1)
+      block_size = int(min(cls.BLOCK_SIZE, expected * 1.05 + 64))
+      indices = last + numpy.cumsum(cls.RANDOM.geometric(p, size=block_size))
+      last = indices[-1]
+      yield indices[indices < number_of_pairs]
+
+  @classmethod
+  def _pairs_from_indices(cls, indices):
+    """Converts indices of pairs to the pairs (u, v), u < v, where the pairs are
+    numbered as (0, 1), (0, 2), (1, 2), (0, 3), (1, 3), (2, 3), ...
+
+    Parameters:
+      indices: A numpy array of pair indices.
+
+    Returns:
+      A tuple (u, v) of numpy arrays with the endpoints of each pair.
+    """
+    indices = numpy.asarray(indices, dtype=numpy.int64)
+    v = ((1 + numpy.sqrt(1 + 8.0 * indices)) / 2).astype(numpy.int64)
+    # Fix the rounding errors of the square root for large indices.
+    v -= (v * (v - 1) // 2 > indices).astype(numpy.int64)
+    v += ((v + 1) * v // 2 <= indices).astype(numpy.int64)
+    u = indices - v * (v - 1) // 2
+    return u, v
+
   @classmethod
   def generate_ER(cls, size_of_network, parameter_list):
     """Generates a graph based on the Erdos-Renyi model.
+    The accepted pairs are drawn with geometric skips, which takes O(n + m).
 
     Parameters:
       size_of_network: An integer indicating the number of nodes in the network.
@@ -102,27 +244,10 @@ class NetworkGenerator(object):
     Returns:
       An igraph graph based on the Erdos-Renyi model.
     """
-    p = parameter_list[0]
-    force_connected = parameter_list[2] if len(parameter_list) > 2 else False
-
     # Create an undirected graph with size_of_network nodes.
     g = igraph.Graph(size_of_network)
-    edges = []
-    has_neighbor = [False for _ in xrange(size_of_network)]
-
-    for i in xrange(size_of_network):
-      for j in xrange(i+1, size_of_network):
-        if cls.RANDOM.uniform() < p:
-              has_neighbor[i] = True
-              edges.append((i, j))
-
-    if force_connected:
-      for i in xrange(size_of_network-1):  
-        # Force the graph to be connected.
-        if not has_neighbor[i]:
-          edges.append((i, cls.RANDOM.choice([_i for _i in xrange(i+1, size_of_network)])))
-
-    g.add_edges(edges)
+    g.add_edges(numpy.concatenate([numpy.zeros((0, 2), dtype=numpy.int64)] +
+        list(cls.stream_ER(size_of_network, parameter_list))).tolist())
     return g
     #return igraph.GraphBase.Erdos_Renyi(n = size_of_network,
     #    p = parameter_list[0], directed = parameter_list[1])
@@ -189,6 +314,8 @@ class NetworkGenerator(object):
   def generate_SF2ER(cls, size_of_network, parameter_list):
     """Generates a graph based on a configuration model.
     Based on the model B in "From Scale-free to Erdos-Renyi Networks".
+    The preferential attachment samples from a Fenwick tree in O(m log n) per
+    node.
 
     Parameters:
       size_of_network: An integer indicating the number of nodes in the network.
@@ -208,34 +335,63 @@ class NetworkGenerator(object):
     m = parameter_list[2]
 
     # Number of edges generated by preferential attachment for each node
-    pa_deg = [0] * size_of_network
+    pa_deg = fenwick_tree.FenwickTree([m0 - 1] * m0 +
+        [0] * (size_of_network - m0))
 
     # Create an undirected graph with size_of_network nodes.
     g = igraph.Graph(size_of_network)
+    edges = numpy.zeros((m0 * (m0 - 1) // 2 + (size_of_network - m0) * m, 2),
+        dtype=numpy.int64)
 
     # Create the fully connected graph.
+    count = 0
     for i in xrange(0, m0):
-      g.add_edges([(i, j) for j in range(0, m0) if j > i])
-      pa_deg[i] = m0-1
+      for j in xrange(i+1, m0):
+        edges[count] = (i, j)
+        count += 1
 
     # Add the remaining nodes.
     for i in xrange(m0, size_of_network):
-      all_nodes = [node for node in xrange(0, size_of_network) if node != i]
-      if cls.RANDOM.random() < alpha:
+      if cls.RANDOM.uniform() < alpha:
         # Connect to m nodes with uniform probability distribution.
-        g.add_edges([(i, j) for j in cls.RANDOM.choice(all_nodes, m, False)])
+        chosen_nodes = cls._uniform_distinct_nodes(size_of_network, m, i)
       else:
         # Connect to m nodes with probability proportional to the degree.
-        deg = [pa_deg[node] for node in all_nodes]
-        total = sum(deg)
-        prob = [degree * 1.0 / total for degree in deg]
-        chosen_nodes = cls.RANDOM.choice(all_nodes, m, False, prob)
+        chosen_nodes = pa_deg.sample_distinct(cls.RANDOM, m)
         for node in chosen_nodes:
-          pa_deg[node] += 1
-          pa_deg[i] += 1
-          g.add_edge(i, node)
+          pa_deg.add(node, 1)
+        pa_deg.add(i, m)
+      edges[count:count + m, 0] = i
+      edges[count:count + m, 1] = chosen_nodes
+      count += m
+    g.add_edges(edges.tolist())
     return g
 
+  @classmethod
+  def _uniform_distinct_nodes(cls, size_of_network, count, excluded_node):
+    """Samples count distinct nodes uniformly, except the excluded one.
+
+    Parameters:
+      size_of_network: An integer indicating the number of nodes in the network.
+      count: An integer indicating the number of nodes to be sampled.
+      excluded_node: An integer indicating the node that is never sampled.
+
+    Returns:
+      A list of integers that are the sampled nodes.
+    """
+    if count * 2 > size_of_network:
+      return list(cls.RANDOM.choice([node for node in xrange(size_of_network)
+          if node != excluded_node], count, False))
+    chosen_nodes = []
+    seen = set()
+    while len(chosen_nodes) < count:
+      node = cls.RANDOM.randint(size_of_network - 1)
+      node += node >= excluded_node
+      if node not in seen:
+        seen.add(node)
+        chosen_nodes.append(node)
+    return chosen_nodes
+
   @classmethod
   def generate_Waxman(cls, size_of_network, parameter_list, point_list=None):
     """Generates a graph based on the Waxman model.
@@ -249,11 +405,14 @@ class NetworkGenerator(object):
     
     Parameters:
       size_of_network: An integer indicating the number of nodes in the network.
-      parameter_list: A list [alpha, beta, force_connected].
+      parameter_list: A list [alpha, beta, force_connected, epsilon].
         alpha: A double between 0 and 1 representing the density of short edges
             relative to long ones.
         beta: A double representing the edge density.
         force_connected: A boolean indicating if the graph must be connected(default=False).
+        epsilon: A double indicating that pairs whose probability is smaller
+            than it are never connected(optional). Only pairs in nearby cells of
+            a grid are visited, instead of all the pairs.
       point_list: A list where the points will be inserted (optional).
 
     Returns:
@@ -262,6 +421,7 @@ class NetworkGenerator(object):
     alpha = parameter_list[0]
     beta = parameter_list[1]
     force_connected = parameter_list[2] if len(parameter_list) > 2 else False
+    epsilon = parameter_list[3] if len(parameter_list) > 3 else None
 
     # Create an undirected graph with size_of_network nodes.
     g = igraph.Graph(size_of_network)
@@ -270,36 +430,117 @@ class NetworkGenerator(object):
     x = cls.RANDOM.uniform(size=size_of_network)
     y = cls.RANDOM.uniform(size=size_of_network)
 
-    if point_list:
+    if point_list is not None:
       point_list += [(x[_i], y[_i]) for _i in xrange(size_of_network)]
-    # Create the edges.
-    sq2 = math.sqrt(2)
-    edges = []
-    for i in xrange(size_of_network-1):
-      has_neighbor = False
-      for j in xrange(i+1, size_of_network):
-        d = ((x[i] - x[j]) ** 2 + (y[i] - y[j]) ** 2) ** 0.5
-        p = beta * math.exp(-d / (sq2 * alpha))
-        if p > 1:
-          raise Exception('P is larger than 1.')
-        if cls.RANDOM.uniform() < p:
-          has_neighbor = True
-          edges.append((i, j))
-      if force_connected and not has_neighbor:
-        # Forcefully connects to one of the nodes.
-        ps = []
-        for j in xrange(i+1, size_of_network):
-          d = ((x[i] - x[j]) ** 2 + (y[i] - y[j]) ** 2) ** 0.5
-          p = beta * math.exp(-d / (sq2 * alpha))
-          ps.append(p)
-        tot = sum(ps)
-        ps = [_p*1.0/tot for _p in ps]
-        j = cls.RANDOM.choice(range(i+1, size_of_network), p=ps)
-        edges.append((i, j))
-          
-    g.add_edges(edges)
+    g.add_edges(cls._waxman_edges(x, y, alpha, beta, force_connected,
+        epsilon).tolist())
     return g
 
+  @classmethod
+  def _all_pairs(cls, size_of_network):
+    """Generates all pairs (u, v), u < v, of nodes in blocks.
+
+    Parameters:
+      size_of_network: An integer indicating the number of nodes in the network.
+
+    Returns:
+      A generator of tuples (u, v) of numpy arrays.
+    """
+    rows_per_block = max(1, cls.BLOCK_SIZE // max(1, size_of_network))
+    for begin in xrange(0, size_of_network - 1, rows_per_block):
+      rows = numpy.arange(begin, min(begin + rows_per_block, size_of_network - 1))
+      lengths = size_of_network - 1 - rows
+      yield (numpy.repeat(rows, lengths),
+          spatial_grid.ragged_arange(rows + 1, lengths))
+
+  @classmethod
+  def _waxman_pairs(cls, x, y, alpha, beta, epsilon=None):
+    """Generates the candidate pairs of the Waxman model with their probability.
+
+    Parameters:
+      x: A numpy array with the x coordinates of the nodes.
+      y: A numpy array with the y coordinates of the nodes.
+      alpha: A double between 0 and 1 representing the density of short edges
+          relative to long ones.
+      beta: A double representing the edge density.
+      epsilon: A double indicating that pairs with probability smaller than it
+          are ignored (optional). Only nearby cells of a grid are visited.
+
+    Returns:
+      A generator of tuples (u, v, p) of numpy arrays, with u < v.
+    """
+    scale = math.sqrt(2) * alpha
+    if epsilon:
+      if beta <= epsilon:
+        return
+      radius = scale * math.log(beta * 1.0 / epsilon)
+      pairs = spatial_grid.SpatialGrid(x, y, radius).neighbor_pairs(
+          cls.BLOCK_SIZE)
+    else:
+      pairs = cls._all_pairs(len(x))
+    for u, v in pairs:
+      p = beta * numpy.exp(-numpy.hypot(x[u] - x[v], y[u] - y[v]) / scale)
+      if epsilon:
+        keep = p >= epsilon
+        u, v, p = u[keep], v[keep], p[keep]
+      yield u, v, p
+
+  @classmethod
+  def _waxman_edges(cls, x, y, alpha, beta, force_connected, epsilon=None):
+    """Draws the edges of the Waxman model over the given points.
+
+    Parameters:
+      x: A numpy array with the x coordinates of the nodes.
+      y: A numpy array with the y coordinates of the nodes.
+      alpha: A double between 0 and 1 representing the density of short edges
+          relative to long ones.
+      beta: A double representing the edge density.
+      force_connected: A boolean indicating if the graph must be connected.
+      epsilon: A double indicating that pairs with probability smaller than it
+          are ignored (optional).
+
+    Returns:
+      A numpy array with one edge (u, v), u < v, per row.
+    """
+    size_of_network = len(x)
+    edges = [numpy.zeros((0, 2), dtype=numpy.int64)]
+    # For force_connected, each node keeps one node of higher index chosen with
+    # probability proportional to P(u, v), through the smallest exponential key.
+    best_key = numpy.full(size_of_network, numpy.inf)
+    best_target = numpy.full(size_of_network, -1, dtype=numpy.int64)
+    for u, v, p in cls._waxman_pairs(x, y, alpha, beta, epsilon):
+      if len(p) and p.max() > 1:
+        raise Exception('P is larger than 1.')
+      accepted = cls.RANDOM.uniform(size=len(p)) < p
+      edges.append(numpy.column_stack((u[accepted], v[accepted])))
+      if force_connected and len(p):
+        with numpy.errstate(divide='ignore'):
+          keys = cls.RANDOM.exponential(size=len(p)) / p
+        order = numpy.lexsort((keys, u))
+        first = numpy.concatenate([[True], u[order][1:] != u[order][:-1]])
+        nodes = u[order][first]
+        keys = keys[order][first]
+        better = keys < best_key[nodes]
+        best_key[nodes[better]] = keys[better]
+        best_target[nodes[better]] = v[order][first][better]
+    edges = numpy.concatenate(edges)
+
+    if force_connected and size_of_network > 1:
+      # Forcefully connects every node without a neighbor of higher index to
+      # one of them.
+      has_neighbor = numpy.zeros(size_of_network, dtype=bool)
+      has_neighbor[edges[:, 0]] = True
+      lonely = numpy.flatnonzero(~has_neighbor[:-1])
+      for i in lonely[best_target[lonely] < 0]:
+        # No candidate was visited, so all the nodes of higher index are used.
+        d = numpy.hypot(x[i] - x[i+1:], y[i] - y[i+1:])
+        ps = beta * numpy.exp(-d / (math.sqrt(2) * alpha))
+        best_target[i] = (i + 1 + (cls.RANDOM.choice(len(ps), p=ps / ps.sum())
+            if ps.sum() > 0 else numpy.argmin(d)))
+      edges = numpy.concatenate([edges,
+          numpy.column_stack((lonely, best_target[lonely]))])
+    return edges
+
   @classmethod
   def generate_Waxman_with_average_degree(cls, size_of_network, parameter_list):
     """Generates a graph based on the Waxman model.
@@ -311,53 +552,86 @@ class NetworkGenerator(object):
     
     Based on "Routing of Multipoint Connections".
 
-    Uses binary search to determine the beta parameter to produce the desired
-    average degree.
-
-    Warning: Super slow :(
+    The expected number of edges over a fixed set of points is
+    beta * sum(\exp{ \frac{ -d(u, v) }{ sqrt(2) \alpha } }), so beta is solved for
+    the desired average degree and the edges are drawn once. The edges added by
+    force_connected are not taken into account.
 
     Parameters:
       size_of_network: An integer indicating the number of nodes in the network.
-      parameter_list: A list [average_degree, alpha].
+      parameter_list: A list [average_degree, alpha, force_connected, epsilon].
         average_degree: A number indicating the average degree of the network.
         alpha: A double between 0 and 1 representing the density of short edges
             relative to long ones.
         force_connected: A boolean indicating if the graph must be connected(default=False).
+        epsilon: A double indicating that pairs whose probability is smaller
+            than it are never connected(optional).
 
     Returns:
-      An igraph graph based on the Waxman model.
+      An igraph graph based on the Waxman model. With force_connected, the
+          edges are redrawn at most MAX_CONNECTION_RETRIES times until the
+          graph is connected.
     """
     alpha = parameter_list[1]
     force_connected = parameter_list[2] if len(parameter_list) > 2 else False
-    eps = 0.05
-
-    g = cls.generate_Waxman(size_of_network, [alpha, 0.3, force_connected])
-    average_degree_03 = g.ecount() * 2.0 / g.vcount()
-    g = cls.generate_Waxman(size_of_network, [alpha, 0.8, force_connected])
-    average_degree_08 = g.ecount() * 2.0 / g.vcount()
-
-    mid = parameter_list[0] * 0.5 / (average_degree_08 - average_degree_03)
-
-    beg = max(mid-0.1, 0.0)
-    end = min(mid+0.1, 1.0)
-    while beg < end:
-      mid = (beg + end)/2.0
-      g = cls.generate_Waxman(size_of_network, [alpha, mid, force_connected])
-      average_degree = g.ecount() * 2.0 / g.vcount()
-      if abs(average_degree - parameter_list[0]) / parameter_list[0] < eps:
-        cnt = 0
-        while not g.is_connected():
-          print >> sys.stderr, 'ainda no', cnt
-          cnt += 1
-          g = cls.generate_Waxman(size_of_network, [alpha, mid, force_connected])
-        print cnt
+    epsilon = parameter_list[3] if len(parameter_list) > 3 else None
+
+    # Create random points in a 1x1 square.
+    x = cls.RANDOM.uniform(size=size_of_network)
+    y = cls.RANDOM.uniform(size=size_of_network)
+    beta = cls._waxman_beta(x, y, alpha, parameter_list[0], epsilon)
+
+    for retry in xrange(cls.MAX_CONNECTION_RETRIES if force_connected else 1):
+      g = igraph.Graph(size_of_network)
+      g.add_edges(cls._waxman_edges(x, y, alpha, beta, force_connected,
+          epsilon).tolist())
+      if not force_connected or g.is_connected():
         break
-      if average_degree < parameter_list[0]:
-        beg = mid
-      else:
-        end = mid
+    else:
+      print >> sys.stderr, ('Warning: the Waxman graph is not connected after '
+          '%d attempts.' % cls.MAX_CONNECTION_RETRIES)
     return g
 
+  @classmethod
+  def _waxman_beta(cls, x, y, alpha, average_degree, epsilon=None):
+    """Calculates the beta of the Waxman model that gives the average degree
+    expected over the given points.
+
+    Parameters:
+      x: A numpy array with the x coordinates of the nodes.
+      y: A numpy array with the y coordinates of the nodes.
+      alpha: A double between 0 and 1 representing the density of short edges
+          relative to long ones.
+      average_degree: A number indicating the average degree of the network.
+      epsilon: A double indicating that pairs with probability smaller than it
+          are ignored (optional).
+
+    Returns:
+      A double that is the beta parameter.
+    """
+    expected_edges = average_degree * len(x) / 2.0
+    if not epsilon:
+      kernel_sum = sum(p.sum() for _, _, p in
+          cls._waxman_pairs(x, y, alpha, 1.0))
+      beta = expected_edges / kernel_sum
+    else:
+      # With the cutoff, a pair with kernel k is only used when beta * k is at
+      # least epsilon. The kernels are sorted in decreasing order, so the i-th
+      # kernel is the last one used for beta in [epsilon/k_i, epsilon/k_i+1).
+      kernels = numpy.concatenate([numpy.zeros(0)] + [p for _, _, p in
+          cls._waxman_pairs(x, y, alpha, 1.0, epsilon)])
+      if not len(kernels):
+        raise Exception('No pair is closer than the cutoff.')
+      kernels = -numpy.sort(-kernels)
+      lower = epsilon / kernels
+      upper = numpy.concatenate([lower[1:], [numpy.inf]])
+      betas = expected_edges / numpy.cumsum(kernels)
+      i = numpy.flatnonzero(betas < upper)[0]
+      beta = max(betas[i], lower[i])
+    if beta > 1:
+      raise Exception('Beta is larger than 1.')
+    return beta
+
   @classmethod
   def generate_SpatialSF(cls, size_of_network, parameter_list):
     """Generates a graph based on the geographic Scale Free model.
@@ -371,12 +645,15 @@ class NetworkGenerator(object):
     
     Parameters:
       size_of_network: An integer indicating the number of nodes in the network.
-      parameter_list: A list [n0, m, rc].
+      parameter_list: A list [n0, m, rc, epsilon].
         n0: An integer indicating the number of initial active nodes.
         m: An integer indicating the number of outgoing edges for each node
             except the n0 starting ones.
         rc: A double between 0 and 1 representing the density of short edges
             relative to long ones.
+        epsilon: A double indicating that nodes whose exponential term is
+            smaller than it are not considered, unless there are less than m
+            other nodes(optional). Only nearby cells of a grid are visited.
 
     Returns:
       An igraph graph based on the spatial Scale Free model.
@@ -384,6 +661,7 @@ class NetworkGenerator(object):
     n0 = int(parameter_list[0])
     m = int(parameter_list[1])
     rc = parameter_list[2]
+    epsilon = parameter_list[3] if len(parameter_list) > 3 else None
 
     # Create an undirected graph with size_of_network nodes.
     g = igraph.Graph(size_of_network)
@@ -391,24 +669,43 @@ class NetworkGenerator(object):
     # Create random points in a 1x1 square.
     x = cls.RANDOM.uniform(size=size_of_network)
     y = cls.RANDOM.uniform(size=size_of_network)
+    grid = (spatial_grid.SpatialGrid(x, y, -rc * math.log(epsilon))
+        if epsilon else None)
 
-    edges = []
-
-    for i in xrange(n0):
-      for j in xrange(i+1, n0):
-        edges.append((i, j))
+    initial = numpy.array([(i, j) for i in xrange(n0) for j in xrange(i+1, n0)],
+        dtype=numpy.int64).reshape(-1, 2)
+    edges = numpy.zeros((len(initial) + max(size_of_network - n0, 0) * m, 2),
+        dtype=numpy.int64)
+    edges[:len(initial)] = initial
+    degrees = numpy.zeros(size_of_network, dtype=numpy.int64)
+    degrees[:n0] = n0 - 1
 
     for i in xrange(n0, size_of_network):
-      deg = g.degree(range(0, i))
-      prob = []
-      for j in xrange(0, i):
-        d = ((x[i] - x[j]) ** 2 + (y[i] - y[j]) ** 2) ** 0.5
-        prob.append((deg[j] + 1) * math.exp(-d / rc))
-      total = sum(prob)
-      prob = [probability / total for probability in prob]
-      edges += [(i, j) for j in \
-          cls.RANDOM.choice(range(0, i), m, False, prob)]
-    g.add_edges(edges)
+      candidates = None
+      if grid is not None:
+        # Only the previous nodes in nearby cells whose kernel is at least
+        # epsilon are candidates, unless there are not enough of them.
+        candidates = grid.neighborhood(i)
+        candidates = candidates[candidates < i]
+        d = numpy.hypot(x[i] - x[candidates], y[i] - y[candidates])
+        kernel = numpy.exp(-d / rc)
+        keep = kernel >= epsilon
+        if keep.sum() < m:
+          candidates = None
+        else:
+          candidates = candidates[keep]
+          kernel = kernel[keep]
+      if candidates is None:
+        candidates = numpy.arange(i)
+        kernel = numpy.exp(-numpy.hypot(x[i] - x[:i], y[i] - y[:i]) / rc)
+      prob = (degrees[candidates] + 1) * kernel
+      targets = cls.RANDOM.choice(candidates, m, False, prob / prob.sum())
+      begin = len(initial) + (i - n0) * m
+      edges[begin:begin + m, 0] = i
+      edges[begin:begin + m, 1] = targets
+      degrees[targets] += 1
+      degrees[i] += m
+    g.add_edges(edges.tolist())
 
     return g
 
@@ -442,44 +739,289 @@ class NetworkGenerator(object):
 
   @classmethod
   def generate_DegreeSequence(cls, size_of_network, parameter_list):
-    """Generates a simple connected graph with the given degree sequence.
+    """Generates a graph with the given degree sequence.
 
       Parameters:
         size_of_network: An integer indicating the number of nodes in the network.
-        parameter_list: A list [degree_list].
+        parameter_list: A list [degree_list, method].
           degree_list: A list of integers indicating the degree of each node in
               the graph. The sum of the integers must be even.
+          method: A string indicating how the graph is generated(default="vl").
+              "vl": A simple connected graph, generated by igraph.
+              "stub": The stubs of the nodes are matched uniformly at random,
+                  which may create multiple edges and self-loops.
+              "stub_simple": Like "stub", but the multiple edges and
+                  self-loops are removed, so the degrees may be smaller.
 
       Returns:
-        An igraph simple connected graph with the given degree sequence.
+        An igraph graph with the given degree sequence.
+    """
+    method = parameter_list[1] if len(parameter_list) > 1 else "vl"
+    if method == "vl":
+      return igraph.GraphBase.Degree_Sequence(list(parameter_list[0]),
+          method="vl")
+    g = igraph.Graph(len(parameter_list[0]))
+    g.add_edges(cls._stub_matching_edges(parameter_list[0]).tolist())
+    if method == "stub_simple":
+      g.simplify()
+    elif method != "stub":
+      raise Exception('Unknown degree sequence method ' + str(method) + '.')
+    return g
+
+  @classmethod
+  def _stub_matching_edges(cls, degree_sequence):
+    """Matches the stubs of the nodes uniformly at random.
+
+    Parameters:
+      degree_sequence: A list of integers whose sum is even.
+
+    Returns:
+      A numpy array with one edge per row.
+    """
+    stubs = numpy.repeat(numpy.arange(len(degree_sequence)),
+        numpy.asarray(degree_sequence, dtype=numpy.int64))
+    cls.RANDOM.shuffle(stubs)
+    return stubs.reshape(-1, 2)
+
+  @classmethod
+  def _power_law_degrees(cls, count, gamma, minimum_degree, maximum_degree):
+    """Samples degrees with P(k) ~ k^(-gamma) by inverting the cumulative
+    distribution.
+
+    Parameters:
+      count: An integer indicating the number of degrees.
+      gamma: A double indicating the exponent of the distribution.
+      minimum_degree: An integer indicating the smallest degree.
+      maximum_degree: An integer indicating the largest degree.
+
+    Returns:
+      A numpy array of integers with the sampled degrees.
     """
-    return igraph.GraphBase.Degree_Sequence(parameter_list[0], method="vl")
+    support = numpy.arange(minimum_degree, maximum_degree + 1)
+    cumulative = numpy.cumsum(support.astype(numpy.float64) ** (-gamma))
+    cumulative /= cumulative[-1]
+    positions = numpy.searchsorted(cumulative, cls.RANDOM.uniform(size=count),
+        side='right')
+    return support[numpy.minimum(positions, len(support) - 1)]
 
   @classmethod
   def generate_ConfigurationSF(cls, size_of_network, parameter_list):
-    """Generates a simple connected SF network with a given degree distribution.
+    """Generates a SF network with a given degree distribution.
 
     Parameters:
       size_of_network: An integer indicating the number of nodes in the network.
-      parameter_list: A list [gamma].
+      parameter_list: A list [gamma, m, k_max, method].
         gamma: A double indicating the gamma of the degree distribution.
             P(k) ~ k^(-gamma)
         m: An integer indicating the minimum degree.
+        k_max: An integer indicating the maximum degree
+            (default=size_of_network-1).
+        method: A string indicating how the graph is generated from the degree
+            sequence, as in generate_DegreeSequence(default="vl", a simple
+            connected graph).
 
     Returns:
-      An igraph simple connected SF network with a degree distribution defined by
-          the parameter.
+      An igraph SF network with a degree distribution defined by the parameters.
     """
     gamma = parameter_list[0]
     m = parameter_list[1]
-    probabilities = [i**(-gamma) for i in range(m, size_of_network)]
-    total = sum(probabilities)
-    probabilities = [probabilities[i]/total for i in range(len(probabilities))]
-    degree_sequence = list(cls.RANDOM.choice(range(m, size_of_network),
-        size_of_network, True, probabilities))
-    if sum(degree_sequence) % 2 == 1:
+    k_max = (parameter_list[2] if len(parameter_list) > 2 and
+        parameter_list[2] is not None else size_of_network - 1)
+    method = parameter_list[3] if len(parameter_list) > 3 else "vl"
+    degree_sequence = cls._power_law_degrees(size_of_network, gamma, m, k_max)
+    if degree_sequence.sum() % 2 == 1:
       degree_sequence[0] += 1
-    return cls.generate_DegreeSequence(size_of_network, [degree_sequence])
+    return cls.generate_DegreeSequence(size_of_network,
+        [degree_sequence.tolist(), method])
+
+  @classmethod
+  def stream_ER(cls, size_of_network, parameter_list):
+    """Generates the edges of a graph based on the Erdos-Renyi model in chunks,
+    using O(n) memory besides the current chunk.
+
+    Parameters:
+      size_of_network: An integer indicating the number of nodes in the network.
+      parameter_list: A list as in generate_ER.
+
+    Returns:
+      A generator of numpy arrays with at most BLOCK_SIZE edges (u, v) each.
+    """
+    p = parameter_list[0]
+    force_connected = parameter_list[2] if len(parameter_list) > 2 else False
+    number_of_pairs = size_of_network * (size_of_network - 1) // 2
+    has_neighbor = numpy.zeros(size_of_network, dtype=bool)
+    for indices in cls._sample_pair_indices(number_of_pairs, p):
+      u, v = cls._pairs_from_indices(indices)
+      has_neighbor[u] = True
+      yield numpy.column_stack((u, v))
+
+    if force_connected and size_of_network > 1:
+      # Force the graph to be connected: every node without a neighbor of
+      # higher index is connected to one of them.
+      lonely = numpy.flatnonzero(~has_neighbor[:-1])
+      for begin in xrange(0, len(lonely), cls.BLOCK_SIZE):
+        chunk = lonely[begin:begin + cls.BLOCK_SIZE]
+        targets = chunk + 1 + (cls.RANDOM.uniform(size=len(chunk)) *
+            (size_of_network - 1 - chunk)).astype(numpy.int64)
+        yield numpy.column_stack((chunk, targets))
+
+  @classmethod
+  def stream_BA(cls, size_of_network, parameter_list):
+    """Generates the edges of a graph based on the Barabasi-Albert model in
+    chunks, using O(n) memory besides the current chunk.
+    As in igraph, a node with degree k is chosen with probability proportional
+    to k^power + 1 and each node connects to distinct nodes. In directed graphs
+    only the in-degree is used.
+    The new nodes are added in blocks of at most 1/ATTACHMENT_BLOCK_RATIO of
+    the existing nodes, whose targets are drawn at once from the degrees before
+    the block, so the nodes of a block do not attach to each other. This
+    approximates the sequential model up to that ratio and takes
+    O(m + n ATTACHMENT_BLOCK_RATIO log n).
+
+    Parameters:
+      size_of_network: An integer indicating the number of nodes in the network.
+      parameter_list: A list as in generate_BA.
+
+    Returns:
+      A generator of numpy arrays with at most BLOCK_SIZE edges (u, v) each,
+          where u is the new node.
+    """
+    m = parameter_list[0]
+    is_directed = parameter_list[1] if len(parameter_list) > 1 else False
+    power = parameter_list[2] if len(parameter_list) > 2 else 1
+    degrees = numpy.zeros(size_of_network, dtype=numpy.int64)
+    chunks = []
+    pending = 0
+    begin = 1
+    while begin < size_of_network:
+      end = min(size_of_network, begin + max(1, min(begin //
+          cls.ATTACHMENT_BLOCK_RATIO, cls.BLOCK_SIZE // max(1, m))))
+      count = min(m, begin)
+      cumulative = numpy.cumsum(degrees[:begin] ** float(power) + 1)
+      targets = numpy.minimum(numpy.searchsorted(cumulative, cls.RANDOM.uniform(
+          high=cumulative[-1], size=(end - begin, count)), side='right'),
+          begin - 1)
+      ordered = numpy.sort(targets, axis=1)
+      for row in numpy.flatnonzero((ordered[:, 1:] == ordered[:, :-1]).any(1)):
+        # Repeated targets are redrawn one by one, as drawing without
+        # replacement.
+        chosen = []
+        for node in targets[row]:
+          if node not in chosen:
+            chosen.append(node)
+        while len(chosen) < count:
+          node = min(begin - 1, numpy.searchsorted(cumulative,
+              cls.RANDOM.uniform(high=cumulative[-1]), side='right'))
+          if node not in chosen:
+            chosen.append(node)
+        targets[row] = chosen
+      targets = targets.ravel()
+      degrees[:begin] += numpy.bincount(targets, minlength=begin)
+      if not is_directed:
+        degrees[begin:end] += count
+      chunks.append(numpy.column_stack((numpy.repeat(numpy.arange(begin, end),
+          count), targets)))
+      pending += len(targets)
+      if pending >= cls.BLOCK_SIZE:
+        edges = numpy.concatenate(chunks)
+        for first in xrange(0, len(edges) - cls.BLOCK_SIZE + 1, cls.BLOCK_SIZE):
+          yield edges[first:first + cls.BLOCK_SIZE]
+        chunks = [edges[len(edges) - len(edges) % cls.BLOCK_SIZE:]]
+        pending = len(chunks[0])
+      begin = end
+    if pending:
+      yield numpy.concatenate(chunks)
+
+  @classmethod
+  def stream_ConfigurationSF(cls, size_of_network, parameter_list):
+    """Generates the edges of a SF network with a given degree distribution in
+    chunks, using O(n) memory besides the current chunk.
+    The stubs are matched uniformly at random, so the network may have
+    multiple edges and self-loops, as with the "stub" method of
+    generate_ConfigurationSF. Each stub gets a uniform random key and
+    consecutive stubs by key are matched: the number of stubs of every node in
+    the next range of keys is binomial, and the stubs in a range are shuffled.
+    The ranges hold about max(BLOCK_SIZE, n) stubs, so it takes O(m).
+
+    Parameters:
+      size_of_network: An integer indicating the number of nodes in the network.
+      parameter_list: A list [gamma, m, k_max] as in generate_ConfigurationSF.
+
+    Returns:
+      A generator of numpy arrays with at most BLOCK_SIZE edges (u, v) each.
+    """
+    gamma = parameter_list[0]
+    m = parameter_list[1]
+    k_max = (parameter_list[2] if len(parameter_list) > 2 and
+        parameter_list[2] is not None else size_of_network - 1)
+    remaining = cls._power_law_degrees(size_of_network, gamma, m,
+        k_max).astype(numpy.int64)
+    if remaining.sum() % 2 == 1:
+      remaining[0] += 1
+    total = remaining.sum()
+    nodes = numpy.flatnonzero(remaining)
+    unmatched = numpy.zeros(0, dtype=numpy.int64)
+    while total > 0:
+      # Every remaining key is uniform above the previous range, so each
+      # remaining stub falls in the next range with the same probability.
+      probability = min(1.0, float(max(cls.BLOCK_SIZE, len(nodes))) / total)
+      counts = (cls.RANDOM.binomial(remaining[nodes], probability)
+          if probability < 1 else remaining[nodes])
+      stubs = numpy.repeat(nodes, counts)
+      cls.RANDOM.shuffle(stubs)
+      remaining[nodes] -= counts
+      total -= len(stubs)
+      nodes = nodes[remaining[nodes] > 0]
+      stubs = numpy.concatenate((unmatched, stubs))
+      matched = len(stubs) - len(stubs) % 2
+      unmatched = stubs[matched:]
+      edges = stubs[:matched].reshape(-1, 2)
+      for first in xrange(0, len(edges), cls.BLOCK_SIZE):
+        yield edges[first:first + cls.BLOCK_SIZE]
+
+  @classmethod
+  def write_edge_stream(cls, edge_chunks, filename, binary=False):
+    """Writes chunks of edges to a file as they are generated.
+
+    Parameters:
+      edge_chunks: An iterable of numpy arrays with one edge per row, like the
+          ones returned by the stream_* methods.
+      filename: A string indicating the file to be written.
+      binary: A boolean indicating whether the edges are written as pairs of
+          32-bit integers instead of an edgelist with one "u v" line per edge,
+          which is read by Graph::readFromFile(default=False).
+
+    Returns:
+      An integer indicating the number of edges written.
+    """
+    count = 0
+    with open(filename, 'wb') as edge_file:
+      for chunk in edge_chunks:
+        if binary:
+          chunk.astype(numpy.int32).tofile(edge_file)
+        else:
+          edge_file.write(('%d %d\n' * len(chunk)) % tuple(chunk.ravel()))
+        count += len(chunk)
+    return count
+
+def _generate_replica(task):
+  """Generates one replica of generate_ensemble in a worker process.
+
+  Parameters:
+    task: A tuple (type_of_network, size_of_network, parameter_list, seed,
+        filename).
+
+  Returns:
+    A tuple (vcount, edges, is_directed) with the graph, or the filename where
+        it was written.
+  """
+  type_of_network, size_of_network, parameter_list, seed, filename = task
+  g = NetworkGenerator.generate(type_of_network, size_of_network,
+      parameter_list, seed)
+  if filename is None:
+    return g.vcount(), g.get_edgelist(), g.is_directed()
+  g.write_edgelist(filename)
+  return filename
 
 if __name__ == '__main__':
   # print NetworkGenerator.generate_BA_with_average_degree(100, [3, False, 1.5])
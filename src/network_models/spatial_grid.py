@@ -0,0 +1,106 @@
+"""This module buckets points of the unit square in a uniform grid so that only
+    pairs of nearby points have to be visited."""
+
+import math
+import numpy
+
+def ragged_arange(begins, lengths):
+  """Concatenates the ranges [begins[i], begins[i] + lengths[i]).
+
+  Parameters:
+    begins: A numpy array of integers indicating where each range starts.
+    lengths: A numpy array of integers indicating the size of each range.
+
+  Returns:
+    A numpy array with the concatenation of the ranges.
+  """
+  lengths = numpy.asarray(lengths, dtype=numpy.int64)
+  total = lengths.sum()
+  offsets = numpy.cumsum(lengths) - lengths
+  return (numpy.arange(total, dtype=numpy.int64) +
+      numpy.repeat(numpy.asarray(begins, dtype=numpy.int64) - offsets, lengths))
+
+class SpatialGrid(object):
+  """Uniform grid of square cells over the unit square.
+  Any two points closer than cell_size lie in the same or in adjacent cells."""
+
+  # Half of the neighborhood of a cell, so that each pair of cells is visited
+  # once.
+  NEIGHBOR_OFFSETS = [(0, 0), (0, 1), (1, -1), (1, 0), (1, 1)]
+
+  def __init__(self, x, y, cell_size):
+    """Buckets the points.
+
+    Parameters:
+      x: A numpy array with the x coordinates of the points, between 0 and 1.
+      y: A numpy array with the y coordinates of the points, between 0 and 1.
+      cell_size: A double indicating the minimum side of the cells. Cells are
+          never made smaller than needed to hold about one point each.
+    """
+    self.x = numpy.asarray(x)
+    self.y = numpy.asarray(y)
+    size = len(self.x)
+    max_side = max(1, int(math.ceil(math.sqrt(size))))
+    self.side = (max(1, min(int(1.0 / cell_size), max_side)) if cell_size > 0
+        else max_side)
+    self.cell_x = numpy.clip((self.x * self.side).astype(numpy.int64), 0,
+        self.side - 1)
+    self.cell_y = numpy.clip((self.y * self.side).astype(numpy.int64), 0,
+        self.side - 1)
+    cells = self.cell_x * self.side + self.cell_y
+    # Points sorted by cell and the position where each cell starts.
+    self.order = numpy.argsort(cells, kind='mergesort')
+    counts = numpy.bincount(cells, minlength=self.side * self.side)
+    self.start = numpy.concatenate([[0], numpy.cumsum(counts)])
+
+  def cell_points(self, cell_x, cell_y):
+    """Returns a numpy array with the points in the given cell, sorted by
+    index."""
+    cell = cell_x * self.side + cell_y
+    return self.order[self.start[cell]:self.start[cell + 1]]
+
+  def neighborhood(self, point):
+    """Returns a numpy array with the points in the cell of the given point and
+    in the adjacent cells, sorted by cell and then by index."""
+    cell_x = self.cell_x[point]
+    cell_y = self.cell_y[point]
+    return numpy.concatenate([self.cell_points(_x, _y)
+        for _x in xrange(max(cell_x - 1, 0), min(cell_x + 2, self.side))
+        for _y in xrange(max(cell_y - 1, 0), min(cell_y + 2, self.side))])
+
+  def neighbor_pairs(self, block_size):
+    """Generates all pairs of points that lie in the same or in adjacent cells.
+
+    Parameters:
+      block_size: An integer indicating the approximate number of pairs in each
+          generated block.
+
+    Returns:
+      A generator of tuples (u, v) of numpy arrays, with u < v, where each pair
+          of points appears once.
+    """
+    points = numpy.arange(len(self.x), dtype=numpy.int64)
+    for dx, dy in self.NEIGHBOR_OFFSETS:
+      next_x = self.cell_x + dx
+      next_y = self.cell_y + dy
+      valid = (next_x < self.side) & (next_y >= 0) & (next_y < self.side)
+      sources = points[valid]
+      cells = next_x[valid] * self.side + next_y[valid]
+      begins = self.start[cells]
+      lengths = self.start[cells + 1] - begins
+      if not len(sources):
+        continue
+      # Split the sources so that each block has about block_size pairs.
+      cumulative = numpy.cumsum(lengths)
+      splits = numpy.searchsorted(cumulative,
+          numpy.arange(block_size, cumulative[-1], block_size))
+      for chunk in numpy.split(numpy.arange(len(sources)), numpy.unique(splits)):
+        if not len(chunk):
+          continue
+        a = numpy.repeat(sources[chunk], lengths[chunk])
+        b = self.order[ragged_arange(begins[chunk], lengths[chunk])]
+        if dx == 0 and dy == 0:
+          keep = a < b
+          a = a[keep]
+          b = b[keep]
+        yield numpy.minimum(a, b), numpy.maximum(a, b)
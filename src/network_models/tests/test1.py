@@ -0,0 +1,89 @@
+""" This file tests the reproducibility of the seeded generators and the network
+cache."""
+import sys
+sys.path.insert(0, "../")
+import network_cache
+import network_generator
+import numpy
+import os
+import shutil
+import tempfile
+
+generator = network_generator.NetworkGenerator
+
+def edges(graph):
+  return graph.vcount(), graph.get_edgelist()
+
+def main():
+  models = [('BA', [3, False, 1]), ('ER', [0.01]), ('WS', [2, 0.1]),
+      ('SF2ER', [0.5, 5, 3]), ('Waxman_avg', [4, 0.1, True]),
+      ('SpatialSF', [5, 3, 0.2]), ('ConfigurationSF', [2.5, 3])]
+  for type_of_network, parameters in models:
+    first = generator.generate(type_of_network, 300, parameters, seed=1)
+    second = generator.generate(type_of_network, 300, parameters, seed=1)
+    other = generator.generate(type_of_network, 300, parameters, seed=2)
+    print type_of_network, first.ecount(), other.ecount()
+    assert edges(first) == edges(second) and edges(first) != edges(other)
+
+  # The streams are reproducible and their chunks have at most BLOCK_SIZE edges.
+  for stream, parameters in [(generator.stream_ER, [0.01]),
+      (generator.stream_BA, [3]), (generator.stream_ConfigurationSF, [2.5, 3])]:
+    chunks = []
+    previous_block_size = generator.BLOCK_SIZE
+    generator.BLOCK_SIZE = 64
+    try:
+      for _ in xrange(2):
+        with generator.seeded(5):
+          chunks.append(list(stream(2000, parameters)))
+    finally:
+      generator.BLOCK_SIZE = previous_block_size
+    print stream.__name__, len(chunks[0])
+    assert (numpy.concatenate(chunks[0]) == numpy.concatenate(chunks[1])).all()
+    assert all(0 < len(chunk) <= 64 for chunk in chunks[0])
+
+  # The replicas of an ensemble do not depend on the number of workers.
+  serial = generator.generate_ensemble('ER', 200, [0.02], 4, workers=1, seed=3)
+  parallel = generator.generate_ensemble('ER', 200, [0.02], 4, workers=2, seed=3)
+  assert map(edges, serial) == map(edges, parallel)
+  assert edges(serial[0]) != edges(serial[1])
+
+  directory = tempfile.mkdtemp()
+  try:
+    generator.CACHE = network_cache.NetworkCache(directory)
+    first = generator.generate('BA', 500, [2, True, 1], seed=4)
+    cached = generator.generate('BA', 500, [2, True, 1], seed=4)
+    generator.generate('BA', 500, [2, True, 1], seed=5)
+    stats = generator.CACHE.stats()
+    print stats
+    assert edges(first) == edges(cached) and cached.is_directed()
+    assert stats['hits'] == 1 and stats['misses'] == 2 and stats['entries'] == 2
+
+    key = generator.CACHE.key('DegreeSequence', 3, [numpy.arange(2000), 'vl'],
+        1)
+    changed = numpy.arange(2000)
+    changed[1000] = 0
+    assert key != generator.CACHE.key('DegreeSequence', 3, [changed, 'vl'], 1)
+
+    # Corrupt networks are regenerated.
+    key = generator.CACHE.key('BA', 500, [2, True, 1], 4)
+    with open(generator.CACHE.path(key), 'wb') as cache_file:
+      cache_file.write('corrupt')
+    regenerated = generator.generate('BA', 500, [2, True, 1], seed=4)
+    assert edges(regenerated) == edges(first)
+    assert generator.CACHE.get(key) is not None
+
+    # The least recently used networks are evicted.
+    latest = generator.generate('ER', 500, [0.01], seed=4)
+    key = generator.CACHE.key('ER', 500, [0.01], 4)
+    generator.CACHE.max_bytes = os.path.getsize(generator.CACHE.path(key))
+    generator.CACHE.evict()
+    stats = generator.CACHE.stats()
+    print stats
+    assert stats['entries'] == 1 and stats['evictions'] == 2
+    assert edges(generator.CACHE.get(key)) == edges(latest)
+  finally:
+    generator.CACHE = None
+    shutil.rmtree(directory)
+
+if __name__ == '__main__':
+  main()
@@ -7,55 +7,69 @@ import math
 
 class BreadthFirstSearchSampling(object):
 	"""This class implements the BFS Sampling method.
-			This method consists in ."""
+			This method consists in visiting the nodes in breadth first order from a seed
+			node until the sample has the given number of nodes. The sampled graph has the
+			sampled nodes and the edges traversed while visiting them."""
 	@classmethod
 	def sample(cls, graph, parameters):
 		"""Samples a graph.
+		The sampled nodes, in the order they are reached, are the FIFO queue of the
+		search, and the traversed edges are collected in arrays, so the sampled graph is
+		built with a single igraph call.
 
 		Parameters:
 			graph: An igraph.Graph that is the network that will be sampled.
-			parameters: A tuple (sample_size, seed).
-				sample_size: An integer indicating the number of nodes of the sampled graph.
-				seed: An integer indicating the id of the first node. 
+			parameters: A tuple (sample_size, seed) or the sample_size.
+				sample_size: An integer indicating the number of nodes of the sampled graph
+				or a float between 0 and 1 indicating the proportion of nodes to be sampled.
+				seed: An integer indicating the id of the first node (default=random).
 		
 		Returns:
-			An igraph.Graph that is the sampled graph.
+			A tuple (sampled_graph, degrees), where sampled_graph is an igraph.Graph whose
+			node i is the i-th reached node and degrees is a list with their degrees in the
+			original graph.
 		"""
-		sample_size, seed = (parameters if isinstance(parameters, tuple)
-				else parameters, numpy.random.randint(graph.vcount(), size=1)[0])
+		if isinstance(parameters, (tuple, list)):
+			sample_size = parameters[0]
+			seed = parameters[1] if len(parameters) > 1 else None
+		else:
+			sample_size, seed = parameters, None
+		if seed is None:
+			seed = numpy.random.randint(graph.vcount())
 		if sample_size <= 1:
 			sample_size = math.floor(graph.vcount() * sample_size)
+		sample_size = max(1, int(sample_size))
 
-		sampled_vertices = []
-		sampled_graph = igraph.Graph()
-		index_map = {}
-		index_reverse_map = []
-		queue = set([seed])
-
-		count = 1
-		curr_node = seed
-		sampled_graph.add_vertex()
-		index_map[curr_node] = 0
-		index_reverse_map.append(curr_node)
-		reached_sample_size = False
-		while queue and not reached_sample_size:
-			curr_node = queue.pop()
-			neighbours = graph.neighbors(curr_node)
-			for next_node in neighbours:
-				if next_node not in index_map:
-					index_map[next_node] = count
-					index_reverse_map.append(next_node)
-					count += 1
-					sampled_graph.add_vertex()
-					sampled_graph.add_edge(index_map[curr_node], index_map[next_node])
-					sampled_vertices.append(next_node)
-					queue.add(next_node)
-				elif not sampled_graph.are_connected(index_map[curr_node],
-						index_map[next_node]):
-					sampled_graph.add_edge(index_map[curr_node], index_map[next_node])
-				if count == sample_size:
-					reached_sample_size = True
-					break
+		# Position of each node in the sample, or -1 if it has not been reached.
+		dtype = numpy.int32 if graph.vcount() < 2 ** 31 else numpy.int64
+		position = numpy.full(graph.vcount(), -1, dtype=dtype)
+		position[seed] = 0
+		sampled_vertices = [seed]
+		sources = []
+		targets = []
+		head = 0
+		while head < len(sampled_vertices) and len(sampled_vertices) < sample_size:
+			curr_node = sampled_vertices[head]
+			neighbours = numpy.unique(numpy.array(graph.neighbors(curr_node),
+					dtype=numpy.int64))
+			new = position[neighbours] < 0
+			missing = sample_size - len(sampled_vertices)
+			if new.sum() >= missing:
+				# Stop at the neighbour that completes the sample.
+				neighbours = neighbours[:numpy.flatnonzero(new)[missing - 1] + 1]
+				new = new[:len(neighbours)]
+			new_nodes = neighbours[new]
+			position[new_nodes] = numpy.arange(len(sampled_vertices),
+					len(sampled_vertices) + len(new_nodes))
+			sampled_vertices.extend(new_nodes.tolist())
+			# Edges to nodes that were already visited were traversed from them.
+			targets.append(position[neighbours[position[neighbours] > head]])
+			sources.append(numpy.full(len(targets[-1]), head, dtype=dtype))
+			head += 1
+		edges = (numpy.column_stack([numpy.concatenate(sources),
+				numpy.concatenate(targets)]) if sources
+				else numpy.zeros((0, 2), dtype=dtype))
+		sampled_graph = igraph.Graph(n=len(sampled_vertices), edges=edges.tolist())
 		degrees = graph.degree(sampled_vertices)
 		return sampled_graph, degrees
 
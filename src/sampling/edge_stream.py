@@ -0,0 +1,141 @@
+"""This module reads edgelist files in chunks and samples their edges with a
+		reservoir, so that graphs larger than the memory can be sampled in one pass."""
+
+import numpy
+
+def read_edge_chunks(filename, chunk_size=1 << 20, binary=False):
+	"""Generates the edges of a file in chunks.
+
+	Parameters:
+		filename: A string indicating an edgelist with one "u v" line per edge, or a file
+		of pairs of 32-bit integers, as written by NetworkGenerator.write_edge_stream.
+		chunk_size: An integer indicating the approximate number of edges of each chunk.
+		binary: A boolean indicating whether the file has pairs of 32-bit
+		integers(default=False).
+
+	Returns:
+		A generator of numpy arrays of 64-bit integers with one edge per row.
+	"""
+	with open(filename, 'rb') as edge_file:
+		while True:
+			if binary:
+				values = numpy.fromfile(edge_file, dtype=numpy.int32,
+						count=2 * chunk_size).astype(numpy.int64)
+			else:
+				# About 16 bytes per line, which readlines rounds to whole lines.
+				lines = edge_file.readlines(16 * chunk_size)
+				if not lines:
+					break
+				values = numpy.fromstring(''.join(line for line in lines
+						if not line.startswith('#')), dtype=numpy.int64, sep=' ')
+			if binary and not len(values):
+				break
+			if not len(values):
+				# Only comments.
+				continue
+			if len(values) % 2:
+				raise Exception('The file %s does not have two vertices per edge.' %
+						filename)
+			yield values.reshape(-1, 2)
+
+class EdgeReservoir(object):
+	"""Uniform sample without replacement of a stream of edges.
+			With a fixed count k, it keeps k edges with Algorithm R, where the i-th edge
+			(from 0) replaces a random edge of the reservoir with probability k / (i + 1).
+			With a fraction p, each edge is kept with probability p, since the number of
+			edges is unknown until the end of the stream. Whole chunks are processed with
+			vectorized operations."""
+
+	def __init__(self, count=None, fraction=None, random_state=numpy.random):
+		"""Creates an empty reservoir.
+
+		Parameters:
+			count: An integer indicating the number of edges to keep.
+			fraction: A float between 0 and 1 indicating the expected proportion of edges
+			to keep, used when count is None.
+			random_state: A numpy.random.RandomState used to draw the sample.
+		"""
+		if (count is None) == (fraction is None):
+			raise Exception('Either count or fraction must be given.')
+		self.count = count
+		self.fraction = fraction
+		self.random_state = random_state
+		self.seen = 0
+		self.edges = []
+		self.indices = []
+		if count is not None:
+			self.edges = numpy.zeros((count, 2), dtype=numpy.int64)
+			self.indices = numpy.zeros(count, dtype=numpy.int64)
+
+	def add(self, chunk):
+		"""Offers a numpy array of edges, one per row, to the reservoir."""
+		if not len(chunk):
+			return
+		indices = numpy.arange(self.seen, self.seen + len(chunk))
+		self.seen += len(chunk)
+		if self.count is None:
+			kept = self.random_state.uniform(size=len(chunk)) < self.fraction
+			self.edges.append(chunk[kept])
+			self.indices.append(indices[kept])
+			return
+		# The first count edges fill the reservoir.
+		filled = max(0, min(self.count - indices[0], len(chunk)))
+		self.edges[indices[:filled]] = chunk[:filled]
+		self.indices[indices[:filled]] = indices[:filled]
+		slots = (self.random_state.uniform(size=len(chunk) - filled) *
+				(indices[filled:] + 1)).astype(numpy.int64)
+		replacing = numpy.flatnonzero(slots < self.count) + filled
+		slots = slots[replacing - filled]
+		# When several edges of the chunk replace the same slot, the last one wins.
+		_, last = numpy.unique(slots[::-1], return_index=True)
+		last = len(slots) - 1 - last
+		self.edges[slots[last]] = chunk[replacing[last]]
+		self.indices[slots[last]] = indices[replacing[last]]
+
+	def sample(self):
+		"""Returns a numpy array with the sampled edges in the order of the stream."""
+		if self.count is None:
+			edges = (numpy.concatenate(self.edges) if self.edges
+					else numpy.zeros((0, 2), dtype=numpy.int64))
+			return edges
+		size = min(self.count, self.seen)
+		order = numpy.argsort(self.indices[:size], kind='mergesort')
+		return self.edges[:size][order]
+
+def count_degrees(edge_chunks, vertices=None):
+	"""Counts the degrees of vertices in a stream of edges.
+
+	Parameters:
+		edge_chunks: An iterable of numpy arrays with one edge per row.
+		vertices: A sorted numpy array with the vertices whose degrees are counted, so
+		that the memory is O(len(vertices))(optional). By default the degrees of all the
+		vertices are counted in O(largest vertex) memory.
+
+	Returns:
+		A numpy array with the degree of each of the vertices, or of each vertex from 0 to
+		the largest one.
+	"""
+	degrees = numpy.zeros(len(vertices) if vertices is not None else 0,
+			dtype=numpy.int64)
+	for chunk in edge_chunks:
+		endpoints = chunk.ravel()
+		if vertices is not None:
+			if not len(vertices):
+				continue
+			positions = numpy.searchsorted(vertices, endpoints)
+			positions = numpy.minimum(positions, len(vertices) - 1)
+			positions = positions[vertices[positions] == endpoints]
+			degrees += numpy.bincount(positions, minlength=len(vertices))
+			continue
+		degrees = add_degrees(degrees, chunk)
+	return degrees
+
+def add_degrees(degrees, chunk):
+	"""Adds the edges of a chunk to a numpy array with the degree of each vertex from 0,
+	growing it when needed, and returns it."""
+	counts = numpy.bincount(chunk.ravel())
+	if len(counts) > len(degrees):
+		degrees = numpy.concatenate([degrees,
+				numpy.zeros(len(counts) - len(degrees), dtype=numpy.int64)])
+	degrees[:len(counts)] += counts
+	return degrees
@@ -0,0 +1,77 @@
+"""This module implements Forest Fire Sampling method based on 
+		"Sampling from Large Graphs" """
+
+import igraph
+import matplotlib.pyplot as pyplot
+import numpy
+import sampling_arrays
+
+class ForestFireSampling(object):
+	"""This class implements the Forest Fire Sampling method.
+			This method consists in starting fires at random nodes. Each burning node burns a
+			geometrically distributed number, with mean p / (1 - p), of its unburned neighbors,
+			which burn in the next step. A new fire starts when all of them die out, until N
+			nodes are burned, and the sampled graph is the subgraph induced by them."""
+	@classmethod
+	def sample(cls, graph, parameters, random_state=numpy.random):
+		"""Samples a graph.
+
+		Parameters:
+			graph: An igraph.Graph or a sampling_arrays.GraphArrays of the network.
+			parameters: A tuple (sample_size, forward_probability, fires) or the sample_size.
+				sample_size: An integer indicating the number of nodes of the sampled graph
+				or a float between 0 and 1 indicating the proportion of nodes to be sampled.
+				forward_probability: A float p between 0 and 1 (default=0.7).
+				fires: An integer indicating the number of fires that burn at once
+				(default=1).
+			random_state: A numpy.random.RandomState used to draw the sample.
+		
+		Returns:
+			A tuple (sampled_graph, original_degrees), where sampled_graph is an igraph.Graph
+			and original_degrees is a list with the degrees of its nodes in the original graph.
+		"""
+		parameters = (tuple(parameters) if isinstance(parameters, (tuple, list))
+				else (parameters,))
+		forward_probability = parameters[1] if len(parameters) > 1 else 0.7
+		fires = parameters[2] if len(parameters) > 2 else 1
+		if not 0 <= forward_probability < 1:
+			raise Exception('The forward probability must be in [0, 1).')
+		return cls.spread(graph, parameters, fires, lambda count:
+				random_state.geometric(1 - forward_probability, size=count) - 1,
+				random_state)
+
+	@classmethod
+	def spread(cls, graph, parameters, fires, limits, random_state):
+		"""Burns nodes in waves, starting fires at random unburned nodes whenever no node
+		is burning.
+
+		Parameters:
+			graph: An igraph.Graph or a sampling_arrays.GraphArrays of the network.
+			parameters: A tuple whose first element is the sample_size.
+			fires: An integer indicating the number of nodes where fires start at once.
+			limits: A function that, given the number of burning nodes, returns a numpy
+			array with the number of neighbors burned by each one.
+			random_state: A numpy.random.RandomState used to draw the sample.
+
+		Returns:
+			A tuple (sampled_graph, original_degrees) as returned by sample.
+		"""
+		arrays = sampling_arrays.GraphArrays.of(graph)
+		visited = sampling_arrays.VisitedVertices(arrays.vcount,
+				sampling_arrays.sample_size(parameters, arrays.vcount))
+		burning = numpy.zeros(0, dtype=numpy.int64)
+		while not visited.done():
+			if not len(burning):
+				burning = visited.visit(visited.random_unvisited(fires, random_state))
+				continue
+			burned = arrays.sample_neighbors(burning, limits(len(burning)),
+					~visited.visited, random_state)
+			burning = visited.visit(burned)
+		return arrays.induced_subgraph(visited.vertices())
+
+if __name__ == '__main__':
+	size_of_network = 1000
+	graph = igraph.GraphBase.Erdos_Renyi(size_of_network, 0.01)
+	sampled_graph, degrees = ForestFireSampling.sample(graph, 100)
+	pyplot.hist(degrees)
+	pyplot.show()
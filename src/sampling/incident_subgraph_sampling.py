@@ -2,16 +2,17 @@
 		"Statistical Analysis of Network Data" """
 
 import igraph
-import math
 import matplotlib.pyplot as pyplot
+import edge_stream
 import numpy
+import sampling_arrays
 
 class IncidentSubgraphSampling(object):
 	"""This class implements the Incident Subgraph Sampling method.
 			This method consists in sampling N edges uniformly and creating the subgraph
 			that is formed by them."""
 	@classmethod
-	def sample(cls, graph, parameters):
+	def sample(cls, graph, parameters, random_state=numpy.random):
 		"""Samples a graph.
 
 		Parameters:
@@ -19,27 +20,90 @@ class IncidentSubgraphSampling(object):
 			parameters: A tuple (sample_edge_count).
 				sample_edge_count: An integer indicating the number of edges of the sampled graph
 						or a float between 0 and 1 indicating the proportion of edges to be sampled.
+			random_state: A numpy.random.RandomState used to draw the sample.
 		
 		Returns:
-			An igraph.Graph that is the sampled graph.
+			A tuple (sampled_graph, original_degrees), where sampled_graph is an igraph.Graph
+			and original_degrees is a list with the degrees of its nodes in the original graph.
 		"""
-		sample_edge_count = (parameters[0] if isinstance(parameters, tuple)
-				else parameters)
-		if sample_edge_count <= 1:
-			sample_edge_count = math.floor(graph.ecount() * sample_edge_count)
-		sampled_edges = numpy.random.choice(graph.ecount(), sample_edge_count, replace=False)
-		sampled_vertices = set()
-		edge_list = graph.get_edgelist()
-		for edge in sampled_edges:
-			sampled_vertices.add(edge_list[edge][0])
-			sampled_vertices.add(edge_list[edge][0])
-
+		if isinstance(graph, sampling_arrays.GraphArrays):
+			return cls.sample_many(graph, parameters, 1, random_state)[0]
+		sample_edge_count = sampling_arrays.sample_size(parameters, graph.ecount())
+		sampled_edges = sampling_arrays.sample_without_replacement(graph.ecount(),
+				sample_edge_count, random_state).tolist()
+		# Both endpoints of the sampled edges, in the order of the nodes of
+		# subgraph_edges.
+		sampled_vertices = sorted(set(vertex
+				for edge in igraph.EdgeSeq(graph, sampled_edges) for vertex in edge.tuple))
 		sampled_graph = graph.subgraph_edges(sampled_edges)
-		#print sampled_graph.vcount(), sampled_graph.ecount()
 		original_degrees = graph.degree(sampled_vertices)
-
 		return sampled_graph, original_degrees
 
+	@classmethod
+	def sample_many(cls, graph, parameters, repetitions, random_state=numpy.random):
+		"""Draws many samples of a graph, reading the graph only once into the arrays
+		of a sampling_arrays.GraphArrays, which takes O(edges).
+
+		Parameters:
+			graph: An igraph.Graph or a sampling_arrays.GraphArrays of the network.
+			parameters: The parameters of sample.
+			repetitions: An integer indicating the number of samples.
+			random_state: A numpy.random.RandomState used to draw the samples.
+
+		Returns:
+			A list of tuples (sampled_graph, original_degrees) as returned by sample.
+		"""
+		if repetitions == 1 and not isinstance(graph, sampling_arrays.GraphArrays):
+			return [cls.sample(graph, parameters, random_state)]
+		arrays = sampling_arrays.GraphArrays.of(graph)
+		sample_edge_count = sampling_arrays.sample_size(parameters, len(arrays.edges))
+		return [arrays.incident_sample(sample_edge_count, random_state)
+				for _ in xrange(repetitions)]
+
+	@classmethod
+	def sample_file(cls, filename, parameters, second_pass=False, binary=False,
+			random_state=numpy.random):
+		"""Samples the edges of an edgelist file in one pass without loading the graph.
+
+		Parameters:
+			filename: A string indicating the edgelist of the network, read by
+			edge_stream.read_edge_chunks.
+			parameters: A tuple (sample_edge_count).
+				sample_edge_count: An integer indicating the number of edges of the sampled graph
+						or a float between 0 and 1 indicating the expected proportion of edges to be
+						sampled.
+			second_pass: A boolean indicating whether the degrees of the sampled nodes are
+			counted in a second pass over the file, in O(sample) memory, instead of counting
+			the degrees of all the nodes during the first pass(default=False).
+			binary: A boolean indicating whether the file has pairs of 32-bit
+			integers(default=False).
+			random_state: A numpy.random.RandomState used to draw the sample.
+
+		Returns:
+			A tuple (sampled_graph, original_degrees) as returned by sample, where the nodes of
+			sampled_graph are the sampled endpoints in increasing order of their ids.
+		"""
+		sample_edge_count = (parameters[0] if isinstance(parameters, (tuple, list))
+				else parameters)
+		reservoir = (edge_stream.EdgeReservoir(fraction=sample_edge_count,
+				random_state=random_state) if sample_edge_count <= 1 else
+				edge_stream.EdgeReservoir(count=int(sample_edge_count),
+				random_state=random_state))
+		degrees = numpy.zeros(0, dtype=numpy.int64)
+		for chunk in edge_stream.read_edge_chunks(filename, binary=binary):
+			reservoir.add(chunk)
+			if not second_pass:
+				degrees = edge_stream.add_degrees(degrees, chunk)
+		vertices, endpoints = numpy.unique(reservoir.sample(), return_inverse=True)
+		if second_pass:
+			original_degrees = edge_stream.count_degrees(
+					edge_stream.read_edge_chunks(filename, binary=binary), vertices)
+		else:
+			original_degrees = degrees[vertices]
+		sampled_graph = igraph.Graph(n=len(vertices),
+				edges=endpoints.reshape(-1, 2).tolist())
+		return sampled_graph, original_degrees.tolist()
+
 if __name__ == '__main__':
 	size_of_network = 1000
 	graph = igraph.GraphBase.Erdos_Renyi(size_of_network, 0.01)
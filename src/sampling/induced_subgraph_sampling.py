@@ -2,16 +2,16 @@
 		"Statistical Analysis of Network Data" """
 
 import igraph
-import math
 import matplotlib.pyplot as pyplot
 import numpy
+import sampling_arrays
 
 class InducedSubgraphSampling(object):
 	"""This class implements the Induced Subgraph Sampling method.
 			This method consists in sampling N nodes uniformly and creating the subgraph
 			that is induced by them."""
 	@classmethod
-	def sample(cls, graph, parameters):
+	def sample(cls, graph, parameters, random_state=numpy.random):
 		"""Samples a graph.
 
 		Parameters:
@@ -19,19 +19,42 @@ class InducedSubgraphSampling(object):
 			parameters: A tuple (sample_size).
 				sample_size: An integer indicating the number of nodes of the sampled graph
 				or a float between 0 and 1 indicating the proportion of nodes to be sampled.
+			random_state: A numpy.random.RandomState used to draw the sample.
 		
 		Returns:
-			An igraph.Graph that is the sampled graph.
+			A tuple (sampled_graph, original_degrees), where sampled_graph is an igraph.Graph
+			and original_degrees is a list with the degrees of its nodes in the original graph.
 		"""
-		sample_size = (parameters[0] if isinstance(parameters, tuple)
-				else parameters)
-		if sample_size <= 1:
-			sample_size = math.floor(graph.vcount() * sample_size)
-		sampled_vertices = numpy.random.choice(graph.vcount(), sample_size, replace=False)
+		if isinstance(graph, sampling_arrays.GraphArrays):
+			return cls.sample_many(graph, parameters, 1, random_state)[0]
+		sample_size = sampling_arrays.sample_size(parameters, graph.vcount())
+		sampled_vertices = sampling_arrays.sample_without_replacement(graph.vcount(),
+				sample_size, random_state).tolist()
 		sampled_graph = graph.induced_subgraph(sampled_vertices)
 		original_degrees = graph.degree(sampled_vertices)
 		return sampled_graph, original_degrees
 
+	@classmethod
+	def sample_many(cls, graph, parameters, repetitions, random_state=numpy.random):
+		"""Draws many samples of a graph, reading the graph only once into the arrays
+		of a sampling_arrays.GraphArrays, which takes O(edges).
+
+		Parameters:
+			graph: An igraph.Graph or a sampling_arrays.GraphArrays of the network.
+			parameters: The parameters of sample.
+			repetitions: An integer indicating the number of samples.
+			random_state: A numpy.random.RandomState used to draw the samples.
+
+		Returns:
+			A list of tuples (sampled_graph, original_degrees) as returned by sample.
+		"""
+		if repetitions == 1 and not isinstance(graph, sampling_arrays.GraphArrays):
+			return [cls.sample(graph, parameters, random_state)]
+		arrays = sampling_arrays.GraphArrays.of(graph)
+		sample_size = sampling_arrays.sample_size(parameters, arrays.vcount)
+		return [arrays.induced_sample(sample_size, random_state)
+				for _ in xrange(repetitions)]
+
 if __name__ == '__main__':
 	size_of_network = 1000
 	graph = igraph.GraphBase.Erdos_Renyi(size_of_network, 0.01)
@@ -0,0 +1,32 @@
+"""This module implements Metropolis-Hastings Random Walk Sampling method."""
+
+import igraph
+import matplotlib.pyplot as pyplot
+import numpy
+import random_walk_sampling
+
+class MetropolisHastingsRandomWalkSampling(random_walk_sampling.RandomWalkSampling):
+	"""This class implements the Metropolis-Hastings Random Walk Sampling method.
+			This method consists in random walks whose move from node v to a uniformly chosen
+			neighbor w is accepted with probability min(1, degree(v) / degree(w)), so that the
+			nodes are visited uniformly instead of proportionally to their degree."""
+
+	@classmethod
+	def step(cls, arrays, positions, random_state):
+		"""Proposes a uniformly chosen neighbor to each walker and moves the walkers whose
+		proposal is accepted."""
+		proposals = arrays.random_neighbors(positions, random_state)
+		stuck = proposals < 0
+		proposals[stuck] = random_state.randint(arrays.vcount, size=stuck.sum())
+		degrees = arrays.offsets[positions + 1] - arrays.offsets[positions]
+		proposal_degrees = arrays.offsets[proposals + 1] - arrays.offsets[proposals]
+		accepted = stuck | (random_state.uniform(size=len(positions)) *
+				proposal_degrees < degrees)
+		return numpy.where(accepted, proposals, positions)
+
+if __name__ == '__main__':
+	size_of_network = 1000
+	graph = igraph.GraphBase.Erdos_Renyi(size_of_network, 0.01)
+	sampled_graph, degrees = MetropolisHastingsRandomWalkSampling.sample(graph, 100)
+	pyplot.hist(degrees)
+	pyplot.show()
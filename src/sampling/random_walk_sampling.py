@@ -0,0 +1,64 @@
+"""This module implements Random Walk Sampling method."""
+
+import igraph
+import matplotlib.pyplot as pyplot
+import numpy
+import sampling_arrays
+
+class RandomWalkSampling(object):
+	"""This class implements the Random Walk Sampling method.
+			This method consists in moving several walkers at once, each one to a uniformly
+			chosen neighbor at every step, until they visit N nodes, and creating the subgraph
+			induced by the visited nodes."""
+
+	# Number of steps without visiting new nodes after which the walkers jump to
+	# random nodes, since they may be trapped in a small component.
+	MAX_IDLE_STEPS = 100
+
+	@classmethod
+	def sample(cls, graph, parameters, random_state=numpy.random):
+		"""Samples a graph.
+
+		Parameters:
+			graph: An igraph.Graph or a sampling_arrays.GraphArrays of the network.
+			parameters: A tuple (sample_size, walkers) or the sample_size.
+				sample_size: An integer indicating the number of nodes of the sampled graph
+				or a float between 0 and 1 indicating the proportion of nodes to be sampled.
+				walkers: An integer indicating the number of walkers (default=10).
+			random_state: A numpy.random.RandomState used to draw the sample.
+		
+		Returns:
+			A tuple (sampled_graph, original_degrees), where sampled_graph is an igraph.Graph
+			and original_degrees is a list with the degrees of its nodes in the original graph.
+		"""
+		arrays = sampling_arrays.GraphArrays.of(graph)
+		walkers = (parameters[1] if isinstance(parameters, (tuple, list))
+				and len(parameters) > 1 else 10)
+		visited = sampling_arrays.VisitedVertices(arrays.vcount,
+				sampling_arrays.sample_size(parameters, arrays.vcount))
+		positions = random_state.randint(arrays.vcount, size=walkers)
+		visited.visit(positions)
+		idle_steps = 0
+		while not visited.done():
+			positions = cls.step(arrays, positions, random_state)
+			idle_steps = 0 if len(visited.visit(positions)) else idle_steps + 1
+			if idle_steps >= cls.MAX_IDLE_STEPS:
+				positions = random_state.randint(arrays.vcount, size=walkers)
+				idle_steps = 0
+		return arrays.induced_subgraph(visited.vertices())
+
+	@classmethod
+	def step(cls, arrays, positions, random_state):
+		"""Moves each walker to a uniformly chosen neighbor, or to a random node if it
+		has no neighbors."""
+		positions = arrays.random_neighbors(positions, random_state)
+		stuck = positions < 0
+		positions[stuck] = random_state.randint(arrays.vcount, size=stuck.sum())
+		return positions
+
+if __name__ == '__main__':
+	size_of_network = 1000
+	graph = igraph.GraphBase.Erdos_Renyi(size_of_network, 0.01)
+	sampled_graph, degrees = RandomWalkSampling.sample(graph, 100)
+	pyplot.hist(degrees)
+	pyplot.show()
@@ -0,0 +1,188 @@
+"""This module draws samples of many graphs with several sampling methods in a
+    pool of processes, calculates measures of each sample and writes them to a
+    csv file with a header, one row per sample."""
+
+import argparse
+import csv
+import igraph
+import multiprocessing
+import numpy
+import os
+import sampling_arrays
+import sampling_methods
+import sys
+import zlib
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+    '..', 'measures'))
+import batch_measures
+import graph_measures
+import measure_context
+
+# Graph loaded by this process, as a tuple (filename, graph, arrays), so that
+# the tasks of the same graph do not read it again.
+_loaded = None
+
+def load(filename):
+  """Returns a tuple (graph, arrays) with the igraph graph of the edgelist and
+  its sampling_arrays.GraphArrays, reusing the last graph of this process."""
+  global _loaded
+  if _loaded is None or _loaded[0] != filename:
+    _loaded = None
+    graph = igraph.Graph.Read_Edgelist(filename, directed=False)
+    _loaded = (filename, graph, sampling_arrays.GraphArrays(graph))
+  return _loaded[1], _loaded[2]
+
+def parse_method(description):
+  """Converts a "method:parameter,parameter" string, such as "RW:1000,10", to a
+  tuple (method, parameters)."""
+  method, _, values = description.partition(':')
+  parameters = []
+  for value in values.split(',') if values else []:
+    for convert in (int, float):
+      try:
+        value = convert(value)
+        break
+      except ValueError:
+        pass
+    parameters.append(value)
+  return method, tuple(parameters)
+
+def sample_task(task):
+  """Draws one sample and calculates its measures.
+
+  Parameters:
+    task: A tuple (filename, method, parameters, replica, seed, measures,
+        options), where seed is a list of integers for numpy.random and
+        options configures the measure_context.MeasureContext.
+
+  Returns:
+    A tuple (key, row), where key is (filename, method, parameters, replica)
+        and row is None if the sample failed.
+  """
+  filename, method, parameters, replica, seed, measures, options = task
+  key = (filename, method, str(parameters), str(replica))
+  try:
+    graph, arrays = load(filename)
+    numpy.random.seed(seed)
+    source = arrays if method in sampling_methods.SamplingMethods.ARRAY_METHODS \
+        else graph
+    sampled_graph, _ = sampling_methods.SamplingMethods.sample(method, source,
+        parameters)
+    context = measure_context.MeasureContext(sampled_graph, **options)
+    row = [sampled_graph.vcount(), sampled_graph.ecount()] + \
+        graph_measures.Measures.calculate_measures(sampled_graph, measures,
+            context)
+    return key, row
+  except Exception as exception:
+    print >> sys.stderr, 'Error in', key, exception
+    return key, None
+
+def done_samples(out_filename):
+  """Returns the set of keys of the samples that already have a row."""
+  if not os.path.exists(out_filename):
+    return set()
+  with open(out_filename, 'r') as out_file:
+    return set(tuple(row[:4]) for row in csv.reader(out_file) if row)
+
+def run(inputs, methods, replicas, out_filename, measures=None, workers=None,
+    options=None, seed=0):
+  """Samples each graph replicas times with each method, calculates the
+  measures of every sample and appends them to the output as they finish.
+  The samples that already have a row in the output are skipped, so an
+  interrupted run can be resumed.
+
+  Parameters:
+    inputs: A list of directories or glob patterns of edgelists.
+    methods: A list of tuples (method, parameters) of
+        sampling_methods.SamplingMethods.
+    replicas: An integer indicating the number of samples of each graph with
+        each method.
+    out_filename: A string indicating the csv file.
+    measures: A list of measure method names(default=all).
+    workers: An integer indicating the number of processes(default=number of
+        cpus).
+    options: A dict with options of the measure_context.MeasureContext.
+    seed: An integer from which the seed of each sample is derived with its
+        filename, method, parameters and replica, so the samples do not depend
+        on the order they are calculated in or on the other inputs.
+
+  Returns:
+    An integer indicating the number of samples measured. The samples that
+        failed are reported in the standard error and retried by the next run.
+  """
+  measures = graph_measures.Measures.column_names(measures)
+  batch_measures.check_workers(workers, options or {})
+  done = done_samples(out_filename)
+  # The tasks of each graph are consecutive, so each process mostly receives
+  # tasks of the graph it already loaded.
+  tasks = [(filename, method, parameters, replica,
+      [seed, zlib.crc32(filename) & 0xffffffff,
+          zlib.crc32(method + str(parameters)) & 0xffffffff, replica],
+      measures, options or {})
+      for filename in batch_measures.list_files(inputs)
+      for method, parameters in methods
+      for replica in xrange(replicas)
+      if (filename, method, str(parameters), str(replica)) not in done]
+  count = 0
+  failed = 0
+  write_header = not os.path.exists(out_filename) or not os.path.getsize(
+      out_filename)
+  with open(out_filename, 'a') as out_file:
+    writer = csv.writer(out_file)
+    if write_header:
+      writer.writerow(['filename', 'method', 'parameters', 'replica',
+          'vertices', 'edges'] + measures)
+    pool = multiprocessing.Pool(workers) if workers != 1 else None
+    try:
+      results = (pool.imap_unordered(sample_task, tasks,
+          chunksize=max(1, replicas)) if pool
+          else (sample_task(task) for task in tasks))
+      for key, row in results:
+        if row is None:
+          failed += 1
+          continue
+        writer.writerow(list(key) + row)
+        out_file.flush()
+        count += 1
+    finally:
+      if pool:
+        pool.close()
+        pool.join()
+  if failed:
+    print >> sys.stderr, '%d of %d samples failed.' % (failed, len(tasks))
+  return count
+
+def main():
+  parser = argparse.ArgumentParser()
+  parser.add_argument('-i', '--inputs', nargs='+',
+      help='Directories or glob patterns of the edgelists.', required=True)
+  parser.add_argument('-s', '--sampling_methods', nargs='+',
+      help='Sampling methods as method:parameters, such as RW:1000,10 or '
+          'induced:0.1.', required=True)
+  parser.add_argument('-r', '--replicas', type=int, default=1,
+      help='Number of samples of each graph with each method (default=1).')
+  parser.add_argument('-o', '--out_filename',
+      help='Csv file where the measures will be written to.', required=True)
+  parser.add_argument('-m', '--measures', nargs='+',
+      help='Measures to be calculated, such as measure_diameter (default=all).')
+  parser.add_argument('-w', '--workers', type=int,
+      help='Number of processes (default=number of cpus).')
+  parser.add_argument('-p', '--options', nargs='+',
+      help='Options of the measures as name=value, such as '
+          'betweenness_error=0.05.')
+  parser.add_argument('--seed', type=int, default=0,
+      help='Seed of the samples (default=0).')
+
+  args = vars(parser.parse_args())
+  measures = args['measures']
+  if measures:
+    measures = [measure if measure.startswith('measure_')
+        else 'measure_' + measure for measure in measures]
+
+  run(args['inputs'], [parse_method(method)
+      for method in args['sampling_methods']], args['replicas'],
+      args['out_filename'], measures, args['workers'],
+      batch_measures.parse_options(args['options']), args['seed'])
+
+if __name__ == '__main__':
+  main()
@@ -0,0 +1,202 @@
+"""This module keeps the edges and degrees of a graph in NumPy arrays, so that
+		many samples of the graph can be drawn in time proportional to their size."""
+
+import igraph
+import math
+import numpy
+
+def sample_size(parameters, population):
+	"""Returns the number of elements to sample given by parameters, a tuple whose first
+	element, or a number that is, an integer indicating the number of elements or a
+	float between 0 and 1 indicating the proportion of the population."""
+	count = (parameters[0] if isinstance(parameters, (tuple, list))
+			else parameters)
+	if count <= 1:
+		count = math.floor(population * count)
+	return int(count)
+
+def sample_without_replacement(population, count, random_state):
+	"""Samples count distinct integers in [0, population) in expected O(count).
+
+	Parameters:
+		population: An integer indicating the number of elements.
+		count: An integer indicating the number of sampled elements.
+		random_state: A numpy.random.RandomState used to draw the samples.
+
+	Returns:
+		A sorted numpy array with the sampled integers.
+	"""
+	if count > population:
+		raise Exception('Cannot sample %d of %d elements.' % (count, population))
+	if count * 2 > population:
+		return numpy.sort(random_state.permutation(population)[:count])
+	chosen = numpy.unique(random_state.randint(population, size=count))
+	while len(chosen) < count:
+		chosen = numpy.union1d(chosen,
+				random_state.randint(population, size=count - len(chosen)))
+	return chosen
+
+def first_occurrences(values):
+	"""Returns a numpy array with the distinct values in order of first occurrence."""
+	_, first = numpy.unique(values, return_index=True)
+	return values[numpy.sort(first)]
+
+class GraphArrays(object):
+	"""Edges, degrees and adjacency lists of a graph in NumPy arrays.
+			The graph is read once, in O(n + m), and each sample is built from the arrays."""
+
+	@classmethod
+	def of(cls, graph):
+		"""Returns graph if it is a GraphArrays or the GraphArrays of an igraph.Graph."""
+		return graph if isinstance(graph, cls) else cls(graph)
+
+	def __init__(self, graph):
+		"""Reads the graph.
+
+		Parameters:
+			graph: An igraph.Graph that is the network that will be sampled.
+		"""
+		self.vcount = graph.vcount()
+		self.directed = graph.is_directed()
+		dtype = numpy.int32 if self.vcount < 2 ** 31 else numpy.int64
+		self.edges = numpy.array(graph.get_edgelist(), dtype=dtype).reshape(-1, 2)
+		self.degrees = numpy.array(graph.degree(), dtype=numpy.int64)
+		# Adjacency lists of the edges leaving each vertex, with both directions of
+		# undirected edges, as the ids of the edges and of the other endpoints.
+		sources, targets = self.edges[:, 0], self.edges[:, 1]
+		edge_ids = numpy.arange(len(self.edges), dtype=numpy.int64)
+		if not self.directed:
+			sources, targets = (numpy.concatenate([sources, targets]),
+					numpy.concatenate([targets, sources]))
+			edge_ids = numpy.concatenate([edge_ids, edge_ids])
+		order = numpy.argsort(sources, kind='mergesort')
+		self.neighbor_vertices = targets[order]
+		self.neighbor_edges = edge_ids[order]
+		self.offsets = numpy.concatenate([[0], numpy.cumsum(numpy.bincount(sources,
+				minlength=self.vcount))])
+		# Position of each vertex in the current sample, or -1. It is reset after
+		# each sample, so that it is only allocated once.
+		self.position = numpy.full(self.vcount, -1, dtype=numpy.int64)
+
+	def subgraph(self, vertices, edge_ids):
+		"""Builds the subgraph with the given sorted vertices and edge ids.
+
+		Returns:
+			A tuple (sampled_graph, degrees), where degrees is a list with the degrees
+			in the original graph of the vertices of sampled_graph.
+		"""
+		self.position[vertices] = numpy.arange(len(vertices))
+		edges = self.position[self.edges[edge_ids]]
+		self.position[vertices] = -1
+		sampled_graph = igraph.Graph(n=len(vertices), edges=edges.tolist(),
+				directed=self.directed)
+		return sampled_graph, self.degrees[vertices].tolist()
+
+	def neighbor_entries(self, vertices):
+		"""Returns a tuple (entries, lengths), where entries is a numpy array with the
+		positions in neighbor_vertices of the neighbors of each vertex, one vertex after
+		the other, and lengths has the number of neighbors of each vertex."""
+		begins = self.offsets[vertices]
+		lengths = self.offsets[numpy.asarray(vertices) + 1] - begins
+		entries = (numpy.arange(lengths.sum(), dtype=numpy.int64) +
+				numpy.repeat(begins - (numpy.cumsum(lengths) - lengths), lengths))
+		return entries, lengths
+
+	def random_neighbors(self, vertices, random_state=numpy.random):
+		"""Returns a numpy array with a uniformly chosen neighbor of each vertex, or -1
+		for vertices without neighbors."""
+		begins = self.offsets[vertices]
+		lengths = self.offsets[vertices + 1] - begins
+		choices = begins + (random_state.uniform(size=len(vertices)) *
+				lengths).astype(numpy.int64)
+		choices = numpy.minimum(choices, len(self.neighbor_vertices) - 1)
+		return numpy.where(lengths > 0, self.neighbor_vertices[choices], -1)
+
+	def sample_neighbors(self, vertices, limits, allowed, random_state=numpy.random):
+		"""Samples without replacement up to limits[i] of the allowed neighbors of each
+		vertex vertices[i].
+
+		Parameters:
+			vertices: A numpy array of vertices.
+			limits: A numpy array of integers with the number of neighbors of each vertex.
+			allowed: A numpy array of booleans indicating which vertices can be sampled.
+			random_state: A numpy.random.RandomState used to draw the samples.
+
+		Returns:
+			A numpy array with the sampled neighbors of each vertex, one vertex after the
+			other, which may repeat among vertices.
+		"""
+		entries, lengths = self.neighbor_entries(vertices)
+		owners = numpy.repeat(numpy.arange(len(vertices)), lengths)
+		candidates = self.neighbor_vertices[entries]
+		keep = allowed[candidates]
+		candidates, owners = candidates[keep], owners[keep]
+		# Shuffle the neighbors of each vertex and take the first ones.
+		order = numpy.lexsort((random_state.uniform(size=len(candidates)), owners))
+		candidates, owners = candidates[order], owners[order]
+		ranks = (numpy.arange(len(owners)) -
+				numpy.searchsorted(owners, owners, side='left'))
+		return candidates[ranks < numpy.asarray(limits)[owners]]
+
+	def induced_subgraph(self, vertices):
+		"""Returns the subgraph induced by the given sorted vertices as a tuple
+		(sampled_graph, degrees). It takes O(sum of their degrees)."""
+		entries, _ = self.neighbor_entries(vertices)
+		self.position[vertices] = 1
+		inside = self.position[self.neighbor_vertices[entries]] >= 0
+		self.position[vertices] = -1
+		edge_ids = numpy.unique(self.neighbor_edges[entries[inside]])
+		return self.subgraph(vertices, edge_ids)
+
+	def incident_sample(self, count, random_state=numpy.random):
+		"""Samples count edges uniformly and returns the subgraph formed by them and
+		their endpoints, as a tuple (sampled_graph, degrees)."""
+		edge_ids = sample_without_replacement(len(self.edges), count, random_state)
+		vertices = numpy.unique(self.edges[edge_ids])
+		return self.subgraph(vertices, edge_ids)
+
+	def induced_sample(self, count, random_state=numpy.random):
+		"""Samples count vertices uniformly and returns the subgraph induced by them,
+		as a tuple (sampled_graph, degrees). It takes O(sum of their degrees)."""
+		return self.induced_subgraph(sample_without_replacement(self.vcount, count,
+				random_state))
+
+class VisitedVertices(object):
+	"""Vertices visited by an exploration until it reaches the sample size."""
+
+	def __init__(self, vcount, sample_size):
+		if sample_size > vcount:
+			raise Exception('Cannot sample %d of %d nodes.' % (sample_size, vcount))
+		self.visited = numpy.zeros(vcount, dtype=bool)
+		self.sample_size = sample_size
+		self.order = []
+		self.count = 0
+
+	def visit(self, vertices):
+		"""Marks the given vertices as visited, in order, until the sample is complete.
+
+		Returns:
+			A numpy array with the vertices that were not visited before.
+		"""
+		vertices = numpy.asarray(vertices, dtype=numpy.int64)
+		new = first_occurrences(vertices[~self.visited[vertices]])
+		new = new[:self.sample_size - self.count]
+		self.visited[new] = True
+		self.order.append(new)
+		self.count += len(new)
+		return new
+
+	def done(self):
+		return self.count >= self.sample_size
+
+	def random_unvisited(self, count, random_state=numpy.random):
+		"""Returns a numpy array with up to count distinct unvisited vertices."""
+		unvisited = numpy.flatnonzero(~self.visited)
+		count = min(count, len(unvisited))
+		return unvisited[sample_without_replacement(len(unvisited), count,
+				random_state)]
+
+	def vertices(self):
+		"""Returns a sorted numpy array with the visited vertices."""
+		return numpy.sort(numpy.concatenate(self.order)) if self.order else (
+				numpy.zeros(0, dtype=numpy.int64))
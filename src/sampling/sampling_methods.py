@@ -1,16 +1,24 @@
 """This module gathers sampling methods."""
 
 import breadth_first_search_sampling
+import forest_fire_sampling
 import igraph
 import incident_subgraph_sampling
 import induced_subgraph_sampling
+import metropolis_hastings_random_walk_sampling
 import numpy
 import math
+import random_walk_sampling
+import snowball_sampling
 import sys
 
 class SamplingMethods(object):
   """Sampling methods caller."""
 
+  # Methods that also accept a sampling_arrays.GraphArrays instead of the graph.
+  ARRAY_METHODS = ["incident", "induced", "RW", "MHRW", "snowball",
+      "forest_fire"]
+
   @classmethod
   def sample(cls, sampling_method, graph, parameter_list):
     """Generates a network of the given type and with the given parameters.
@@ -25,10 +33,35 @@ class SamplingMethods(object):
     sampling_method_dict = {
         "BFS": breadth_first_search_sampling.BreadthFirstSearchSampling.sample,
         "incident": incident_subgraph_sampling.IncidentSubgraphSampling.sample,
-        "induced": induced_subgraph_sampling.InducedSubgraphSampling.sample
+        "induced": induced_subgraph_sampling.InducedSubgraphSampling.sample,
+        "RW": random_walk_sampling.RandomWalkSampling.sample,
+        "MHRW": metropolis_hastings_random_walk_sampling.
+            MetropolisHastingsRandomWalkSampling.sample,
+        "snowball": snowball_sampling.SnowballSampling.sample,
+        "forest_fire": forest_fire_sampling.ForestFireSampling.sample
     }
     return sampling_method_dict[sampling_method](graph, parameter_list)
 
+  @classmethod
+  def sample_many(cls, sampling_method, graph, parameter_list, repetitions):
+    """Draws many samples of a graph with a method that reads the graph once.
+    Parameters:
+      sampling_method: A string that represents the desired sampling method.
+      graph: The graph that will be sampled.
+      parameter_list: A list of parameters for the given method.
+      repetitions: An integer indicating the number of samples.
+
+    Returns:
+      A list with the return values of each sample.
+    """
+    sampling_method_dict = {
+        "incident":
+            incident_subgraph_sampling.IncidentSubgraphSampling.sample_many,
+        "induced": induced_subgraph_sampling.InducedSubgraphSampling.sample_many
+    }
+    return sampling_method_dict[sampling_method](graph, parameter_list,
+        repetitions)
+
 def test():
   size_of_network = 1000
   graph = igraph.GraphBase.Erdos_Renyi(size_of_network, 0.01)
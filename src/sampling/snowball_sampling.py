@@ -0,0 +1,44 @@
+"""This module implements Snowball Sampling method."""
+
+import forest_fire_sampling
+import igraph
+import matplotlib.pyplot as pyplot
+import numpy
+
+class SnowballSampling(object):
+	"""This class implements the Snowball Sampling method.
+			This method consists in visiting, from each node of a wave, up to k of its unvisited
+			neighbors, which form the next wave, until N nodes are visited, and creating the
+			subgraph induced by them. The first wave is made of random seed nodes."""
+	@classmethod
+	def sample(cls, graph, parameters, random_state=numpy.random):
+		"""Samples a graph.
+
+		Parameters:
+			graph: An igraph.Graph or a sampling_arrays.GraphArrays of the network.
+			parameters: A tuple (sample_size, k, seeds) or the sample_size.
+				sample_size: An integer indicating the number of nodes of the sampled graph
+				or a float between 0 and 1 indicating the proportion of nodes to be sampled.
+				k: An integer indicating the number of neighbors visited from each node
+				(default=3).
+				seeds: An integer indicating the number of nodes of the first wave
+				(default=1).
+			random_state: A numpy.random.RandomState used to draw the sample.
+		
+		Returns:
+			A tuple (sampled_graph, original_degrees), where sampled_graph is an igraph.Graph
+			and original_degrees is a list with the degrees of its nodes in the original graph.
+		"""
+		parameters = (tuple(parameters) if isinstance(parameters, (tuple, list))
+				else (parameters,))
+		k = parameters[1] if len(parameters) > 1 else 3
+		seeds = parameters[2] if len(parameters) > 2 else 1
+		return forest_fire_sampling.ForestFireSampling.spread(graph, parameters, seeds,
+				lambda count: numpy.full(count, k, dtype=numpy.int64), random_state)
+
+if __name__ == '__main__':
+	size_of_network = 1000
+	graph = igraph.GraphBase.Erdos_Renyi(size_of_network, 0.01)
+	sampled_graph, degrees = SnowballSampling.sample(graph, 100)
+	pyplot.hist(degrees)
+	pyplot.show()
@@ -0,0 +1,109 @@
+""" This file tests the sampling methods against the subgraphs built by igraph and
+their reproducibility with a seeded numpy.random.RandomState."""
+import sys
+sys.path.insert(0, "../")
+import breadth_first_search_sampling
+import edge_stream
+import forest_fire_sampling
+import igraph
+import incident_subgraph_sampling
+import induced_subgraph_sampling
+import metropolis_hastings_random_walk_sampling
+import numpy
+import os
+import random_walk_sampling
+import sampling_arrays
+import snowball_sampling
+import tempfile
+
+def edge_set(graph):
+	"""Returns the sorted edges of a graph, with the endpoints of undirected edges
+	in increasing order."""
+	edges = numpy.array(graph.get_edgelist(), dtype=numpy.int64).reshape(-1, 2)
+	if not graph.is_directed():
+		edges.sort(axis=1)
+	return sorted(map(tuple, edges.tolist()))
+
+def same_sample(first, second):
+	return (first[0].vcount() == second[0].vcount() and
+			edge_set(first[0]) == edge_set(second[0]) and
+			list(first[1]) == list(second[1]))
+
+def main():
+	induced = induced_subgraph_sampling.InducedSubgraphSampling
+	incident = incident_subgraph_sampling.IncidentSubgraphSampling
+	for graph in [igraph.Graph.Erdos_Renyi(500, 0.02),
+			igraph.Graph.Erdos_Renyi(500, 0.02, directed=True)]:
+		arrays = sampling_arrays.GraphArrays.of(graph)
+		for seed in xrange(5):
+			vertices = sampling_arrays.sample_without_replacement(graph.vcount(), 100,
+					numpy.random.RandomState(seed)).tolist()
+			expected = graph.induced_subgraph(vertices), graph.degree(vertices)
+			for source in [graph, arrays]:
+				assert same_sample(expected, induced.sample(source, [100],
+						numpy.random.RandomState(seed)))
+
+			edge_ids = sampling_arrays.sample_without_replacement(graph.ecount(), 300,
+					numpy.random.RandomState(seed)).tolist()
+			expected = graph.subgraph_edges(edge_ids)
+			vertices = sorted(set(numpy.array(graph.get_edgelist())[edge_ids].ravel()))
+			expected = expected, graph.degree(vertices)
+			for source in [graph, arrays]:
+				assert same_sample(expected, incident.sample(source, [300],
+						numpy.random.RandomState(seed)))
+
+		samples = induced.sample_many(graph, [0.1], 3, numpy.random.RandomState(7))
+		again = induced.sample_many(arrays, [0.1], 3, numpy.random.RandomState(7))
+		print [sample.vcount() for sample, _ in samples]
+		assert all(same_sample(first, second) for first, second in zip(samples, again))
+
+	# The explorations are reproducible and visit the whole graph when the sample
+	# has all its nodes.
+	graph = igraph.Graph.Barabasi(400, 2)
+	arrays = sampling_arrays.GraphArrays.of(graph)
+	explorations = [random_walk_sampling.RandomWalkSampling,
+			metropolis_hastings_random_walk_sampling.MetropolisHastingsRandomWalkSampling,
+			snowball_sampling.SnowballSampling, forest_fire_sampling.ForestFireSampling]
+	for method in explorations:
+		first = method.sample(graph, [50], numpy.random.RandomState(3))
+		second = method.sample(arrays, [50], numpy.random.RandomState(3))
+		print method.__name__, first[0].vcount(), first[0].ecount()
+		assert first[0].vcount() == 50 and same_sample(first, second)
+		assert all(sampled <= original
+				for sampled, original in zip(first[0].degree(), first[1]))
+		whole = method.sample(arrays, [graph.vcount()], numpy.random.RandomState(3))
+		assert same_sample(whole, (graph, graph.degree()))
+
+	# The node i of a breadth first sample is the i-th node reached by igraph.
+	order = graph.bfs(0)[0]
+	for size in [50, graph.vcount()]:
+		sampled_graph, degrees = (breadth_first_search_sampling.BreadthFirstSearchSampling.
+				sample(graph, [size, 0]))
+		print sampled_graph.vcount(), sampled_graph.ecount()
+		assert sampled_graph.is_connected() and degrees == graph.degree(order[:size])
+		assert all(graph.are_connected(order[u], order[v])
+				for u, v in sampled_graph.get_edgelist())
+
+	# Sampling all the edges of a file gives the whole graph without its isolated
+	# nodes.
+	graph = igraph.Graph.Erdos_Renyi(300, 0.005)
+	vertices = [v for v in xrange(graph.vcount()) if graph.degree(v)]
+	handle, filename = tempfile.mkstemp()
+	os.close(handle)
+	try:
+		graph.write_edgelist(filename)
+		for second_pass in [False, True]:
+			sampled_graph, degrees = incident.sample_file(filename, [1.0], second_pass,
+					random_state=numpy.random.RandomState(1))
+			assert same_sample((sampled_graph, degrees),
+					(graph.induced_subgraph(vertices), graph.degree(vertices)))
+		with open(filename, 'w') as edge_file:
+			edge_file.write('# No edges.\n')
+		sampled_graph, degrees = incident.sample_file(filename, [10])
+		print sampled_graph.vcount(), degrees
+		assert sampled_graph.vcount() == 0 and degrees == []
+	finally:
+		os.remove(filename)
+
+if __name__ == '__main__':
+	main()
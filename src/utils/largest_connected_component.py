@@ -1,86 +1,138 @@
 """This module reads a graph from a file and writes its largest connected component in a file."""
 import argparse
+import numpy
 
-def find(uf, a):
-  if uf[a] == a:
+class UnionFind(object):
+  """Disjoint set union over the vertices 0..n-1, backed by numpy arrays."""
+
+  def __init__(self, size):
+    self.parent = numpy.arange(size, dtype=numpy.int64)
+    self.size = numpy.ones(size, dtype=numpy.int64)
+
+  def find(self, a):
+    """Returns the representative of a, halving the path to it."""
+    parent = self.parent
+    while parent[a] != a:
+      parent[a] = parent[parent[a]]
+      a = parent[a]
     return a
-  uf[a] = find(uf, uf[a])
-  return uf[a]
-
-def union(uf, a, b):
-  if a not in uf:
-    uf[a] = a
-  if b not in uf:
-    uf[b] = b
-  a = find(uf, a)
-  b = find(uf, b)
-  uf[a] = b
+
+  def union(self, a, b):
+    """Joins the sets of a and b, hanging the smaller one from the larger one."""
+    a = self.find(a)
+    b = self.find(b)
+    if a == b:
+      return
+    if self.size[a] > self.size[b]:
+      a, b = b, a
+    self.parent[a] = b
+    self.size[b] += self.size[a]
+
+  def find_all(self):
+    """Points every vertex to its representative and returns the parents."""
+    parent = self.parent
+    while True:
+      grandparent = parent[parent]
+      if (grandparent == parent).all():
+        return parent
+      parent[:] = grandparent
+
+  def union_edges(self, sources, targets):
+    """Joins the sets of the endpoints of every edge with vectorized rounds.
+    In each round the representatives of both endpoints are found for all the
+    edges at once and the smaller set of each edge is hung from the larger one,
+    breaking ties by vertex, so that no cycles are formed.
+
+    Parameters:
+      sources: A numpy array with the first endpoint of each edge.
+      targets: A numpy array with the second endpoint of each edge.
+    """
+    while len(sources):
+      parent = self.find_all()
+      a = parent[sources]
+      b = parent[targets]
+      keep = a != b
+      if not keep.any():
+        break
+      sources, targets, a, b = sources[keep], targets[keep], a[keep], b[keep]
+      smaller = ((self.size[a] < self.size[b]) |
+          ((self.size[a] == self.size[b]) & (a < b)))
+      child = numpy.where(smaller, a, b)
+      new_parent = numpy.where(smaller, b, a)
+      # When a set has several candidate parents, the one written last wins.
+      self.parent[child] = new_parent
+      self.size = numpy.bincount(self.find_all(), minlength=len(self.parent))
+
+def largest_component_edges(sources, targets):
+  """Returns the edges of the largest connected component, relabeled.
+  The input graph is considered undirected and the edges keep their order.
+  The vertices of the component are relabeled from 0 in increasing order of
+  their ids.
+
+  Parameters:
+    sources: A numpy array with the first endpoint of each edge.
+    targets: A numpy array with the second endpoint of each edge.
+
+  Returns:
+    A tuple (sources, targets, vertices), where vertices is a numpy array with
+        the original id of each relabeled vertex.
+  """
+  vertices, endpoints = numpy.unique(numpy.concatenate([sources, targets]),
+      return_inverse=True)
+  union_find = UnionFind(len(vertices))
+  union_find.union_edges(endpoints[:len(sources)], endpoints[len(sources):])
+  roots = union_find.find_all()
+  if not len(roots):
+    return sources, targets, vertices
+  largest = numpy.argmax(numpy.bincount(roots))
+  inside = roots == largest
+  relabel = numpy.cumsum(inside) - 1
+  edges = inside[endpoints[:len(sources)]]
+  return (relabel[endpoints[:len(sources)][edges]],
+      relabel[endpoints[len(sources):][edges]], vertices[inside])
 
 def lcc(graph):
   """This function returns the largest connected component of a graph using
     disjoint set union.
     The input graph is considered undirected and the edges of the output
     graph maintain the same order as the ones in the input graph.
-    The nodes are relabeled."""
-  # Find the connected components.
-  uf = {}
-  for u in graph:
-    for v in graph[u]:
-      union(uf, u, v)
-
-  # Count the number of vertices in each connected component.
-  count = {}
-  for u in uf:
-    if find(uf, u) not in count:
-      count[find(uf, u)] = 0
-    count[find(uf, u)] += 1
-
-  # Find the size of the largest connected component and its representative.
-  mx = 0
-  mxi = -1
-  for u in count:
-    if count[u] > mx:
-      mx = count[u]
-      mxi = u
-
-  # Relabel the nodes in the largest connected component.
-  relabel = {}
-  for u in uf:
-    if find(uf, u) == mxi:
-      relabel[u] = len(relabel)
+    The nodes are relabeled in increasing order of their ids."""
+  sources = numpy.array([u for u in graph for v in graph[u]], dtype=numpy.int64)
+  targets = numpy.array([v for u in graph for v in graph[u]], dtype=numpy.int64)
+  sources, targets, _ = largest_component_edges(sources, targets)
 
   # Create a graph with the largest connected component.
   graphp = {}
-  for u in relabel:
-    if u in graph:
-      graphp[relabel[u]] = []
-      for v in graph[u]:
-        if v in relabel:
-          graphp[relabel[u]].append(relabel[v])
-
+  for u, v in zip(sources.tolist(), targets.tolist()):
+    if u not in graphp:
+      graphp[u] = []
+    graphp[u].append(v)
   return graphp
 
-def write_largest_connected_component(in_filename, out_filename):
-  in_file = open(in_filename, 'r')
-  g = {}
-  for line in in_file:
-    if line[0] == '#':
-      continue
-    u, v = line.split(' ')
-    u = int(u)
-    v = int(v)
-    if u not in g:
-      g[u] = []
-    g[u].append(v)
-  in_file.close()
-  
-  gp = lcc(g)
+def read_edges(in_filename, chunk_lines=1 << 20):
+  """Returns a tuple (sources, targets) of numpy arrays with the edges of a
+  file with one "u v" line per edge, skipping the lines that start with #."""
+  chunks = []
+  with open(in_filename, 'r') as in_file:
+    while True:
+      lines = in_file.readlines(16 * chunk_lines)
+      if not lines:
+        break
+      chunks.append(numpy.fromstring(''.join(line for line in lines
+          if line[0] != '#'), dtype=numpy.int64, sep=' '))
+  edges = (numpy.concatenate(chunks) if chunks
+      else numpy.zeros(0, dtype=numpy.int64)).reshape(-1, 2)
+  return edges[:, 0], edges[:, 1]
+
+def write_largest_connected_component(in_filename, out_filename,
+    chunk_lines=1 << 20):
+  sources, targets, _ = largest_component_edges(*read_edges(in_filename))
 
-  out_file = open(out_filename, 'w')
-  for u in gp:
-    for v in gp[u]:
-      out_file.write(str(u) + ' ' + str(v) + '\n')
-  out_file.close()
+  with open(out_filename, 'w') as out_file:
+    for begin in xrange(0, len(sources), chunk_lines):
+      chunk = numpy.column_stack([sources[begin:begin + chunk_lines],
+          targets[begin:begin + chunk_lines]])
+      out_file.write(('%d %d\n' * len(chunk)) % tuple(chunk.ravel()))
 
 def main():
   parser = argparse.ArgumentParser()
@@ -96,4 +148,4 @@ def main():
   write_largest_connected_component(in_filename, out_filename)
 
 if __name__ == '__main__':
-  main()
\ No newline at end of file
+  main()
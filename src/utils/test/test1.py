@@ -0,0 +1,74 @@
+""" This file tests the largest connected component against the giant component
+found by igraph."""
+import sys
+sys.path.insert(0, "../")
+import igraph
+import largest_connected_component
+import numpy
+import os
+import tempfile
+
+def edge_set(edges):
+  """Returns the sorted undirected edges with their endpoints in order."""
+  edges = numpy.array(edges, dtype=numpy.int64).reshape(-1, 2)
+  edges.sort(axis=1)
+  return sorted(map(tuple, edges.tolist()))
+
+def smallest_members(labels):
+  """Returns a numpy array with the smallest vertex of the set of each vertex."""
+  smallest = numpy.full(len(labels), len(labels), dtype=numpy.int64)
+  numpy.minimum.at(smallest, labels, numpy.arange(len(labels)))
+  return smallest[labels]
+
+def main():
+  for seed in xrange(5):
+    numpy.random.seed(seed)
+    size = 3000
+    edges = numpy.random.randint(size, size=(int(0.6 * size), 2))
+    graph = igraph.Graph(n=size, edges=edges.tolist())
+    membership = numpy.array(graph.clusters().membership)
+    sizes = numpy.bincount(membership)
+    if (sizes == sizes.max()).sum() > 1:
+      continue
+    giant = graph.clusters().giant()
+    sources, targets, vertices = (
+        largest_connected_component.largest_component_edges(edges[:, 0],
+        edges[:, 1]))
+    print giant.vcount(), giant.ecount(), len(vertices), len(sources)
+    assert giant.vcount() > 1
+    assert (vertices == numpy.flatnonzero(membership ==
+        numpy.argmax(sizes))).all()
+    assert edge_set(numpy.column_stack([sources, targets])) == edge_set(
+        giant.get_edgelist())
+    # The edges keep their order.
+    inside = numpy.in1d(edges[:, 0], vertices)
+    assert (vertices[sources] == edges[inside, 0]).all()
+    assert (vertices[targets] == edges[inside, 1]).all()
+
+    # The scalar union gives the same sets as the vectorized rounds.
+    union_find = largest_connected_component.UnionFind(size)
+    for u, v in edges.tolist():
+      union_find.union(u, v)
+    roots = numpy.array([union_find.find(u) for u in xrange(size)])
+    vectorized = largest_connected_component.UnionFind(size)
+    vectorized.union_edges(edges[:, 0], edges[:, 1])
+    expected = smallest_members(membership)
+    assert (smallest_members(roots) == expected).all()
+    assert (smallest_members(vectorized.find_all()) == expected).all()
+
+  graph = {0: [1, 2], 3: [4], 5: [0]}
+  print largest_connected_component.lcc(graph)
+  assert largest_connected_component.lcc(graph) == {0: [1, 2], 3: [0]}
+
+  handle, filename = tempfile.mkstemp()
+  os.close(handle)
+  try:
+    largest_connected_component.write_largest_connected_component(
+        'lcc_test1.in', filename)
+    with open(filename) as out_file, open('lcc_test1.out') as expected:
+      assert out_file.read() == expected.read()
+  finally:
+    os.remove(filename)
+
+if __name__ == '__main__':
+  main()